@@ -1,10 +1,13 @@
 import cv2
+from detectorRostros import crearDetector
 
 def nothing(x):
     pass
 
 cap = cv2.VideoCapture(0)
-faceClassif = cv2.CascadeClassifier('haarcascade_frontalface_default.xml')
+faceClassif = crearDetector('HAAR', archivo='haarcascade_frontalface_default.xml', scaleFactor=1.3, minNeighbors=5)
+#faceClassif = crearDetector('SSD', anchoEntrada=300)
+#faceClassif = crearDetector('YUNET', anchoEntrada=320)
 cv2.namedWindow('frame')
 cv2.createTrackbar('Blur','frame',0,15,nothing)
 cv2.createTrackbar('Gray','frame',0,1,nothing)
@@ -16,7 +19,7 @@ while True:
     if grayVal == 1:
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
-    faces = faceClassif.detectMultiScale(frame, 1.3, 5)
+    faces = faceClassif.detectar(frame)
 
     for (x,y,w,h) in faces:
         if val > 0: 
@@ -0,0 +1,168 @@
+#------------------------------ Importamos las librerias ----------------------------------------
+import os
+import json
+import time
+import multiprocessing
+import cv2
+import numpy as np
+from sustractores import SUSTRACTORES, crearSustractor, limpiarMascara
+
+try:
+    import resource  #Solo existe en Linux/Mac, en Windows la memoria se reporta como n/d
+except ImportError:
+    resource = None
+
+#---------------------------------Declaracion de variables---------------------------------------
+#Archivo con los conteos etiquetados a mano, ejemplo: {"autos.mp4": 12, "aeropuerto.mp4": 3}
+archivoVerdad = 'conteos_reales.json'
+
+#Cada video usa los mismos parametros que su script original
+#   eje 'x': se cuenta cuando el borde derecho (x + w) del objeto cae en la franja de la linea
+#   eje 'y': se cuenta cuando el centroide en y del objeto cae en la franja de la linea
+#   eje None: se cuentan los eventos de movimiento (cuando el area pasa de quieta a alerta)
+VIDEOS = {
+    'video.mp4': {                       #Semana 10/detectorAutos.py
+        'ruta': 'video.mp4',
+        'ancho': 800, 'gris': False,
+        'area': lambda an, al: [[330, 16], [an-80, 16], [an-80, 445], [330, 445]],
+        'cerrar': True, 'dilatar': 5, 'areaMin': 500,
+        'eje': 'x', 'linea': 450, 'tolerancia': 10,
+    },
+    'autos.mp4': {                       #Semana 6/18 CONTANDO AUTOS/conteo_autos.py
+        'ruta': '../Semana 6/18 CONTANDO AUTOS/autos.mp4',
+        'ancho': 640, 'gris': False,
+        'area': lambda an, al: [[330, 216], [an-80, 216], [an-80, 271], [330, 271]],
+        'cerrar': True, 'dilatar': 5, 'areaMin': 1500,
+        'eje': 'x', 'linea': 450, 'tolerancia': 10,
+    },
+    'aeropuerto.mp4': {                  #Semana 6/17 Detectar movimiento en CIERTA AREA
+        'ruta': '../Semana 6/17 Detectar movimiento en CIERTA AREA/aeropuerto.mp4',
+        'ancho': None, 'gris': True,
+        'area': lambda an, al: [[240, 320], [480, 320], [620, al], [50, al]],
+        'cerrar': False, 'dilatar': 2, 'areaMin': 500,
+        'eje': None,
+    },
+    'example_01.mp4': {                  #Semana 11/OpenCV-People-Counting-/counter.py
+        'ruta': '../Semana 11/OpenCV-People-Counting-/example_01.mp4',
+        'ancho': None, 'gris': False,
+        'area': lambda an, al: [[0, 0], [an, 0], [an, al], [0, al]],
+        'cerrar': True, 'dilatar': 0, 'areaMin': None,  #None: frameArea/300 como en counter.py
+        'eje': 'y', 'linea': lambda al: int(4*(al/6)), 'tolerancia': 4,
+    },
+}
+
+kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+
+#--------------------------- Funcion que cuenta objetos en un video ------------------------------
+def contarVideo(nombreVideo, nombreSustractor):
+    conf = VIDEOS[nombreVideo]
+    cap = cv2.VideoCapture(conf['ruta'])
+    fgbg = crearSustractor(nombreSustractor)
+    conteo = 0
+    frames = 0
+    tiempo = 0.0
+    alertaAnterior = False
+    imAux = None
+
+    while True:
+        ret, frame = cap.read()
+        if ret == False: break
+
+        if conf['ancho'] is not None:
+            alto = int(frame.shape[0] * conf['ancho'] / frame.shape[1])
+            frame = cv2.resize(frame, (conf['ancho'], alto))
+        if conf['gris']:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        #La mascara del area solo se construye una vez por video
+        if imAux is None:
+            al, an = frame.shape[:2]
+            area_pts = np.array(conf['area'](an, al))
+            imAux = np.zeros(shape=(al, an), dtype=np.uint8)
+            imAux = cv2.drawContours(imAux, [area_pts], -1, (255), -1)
+            areaMin = conf['areaMin'] if conf['areaMin'] is not None else al*an/300
+            linea = conf['linea'](al) if callable(conf.get('linea')) else conf.get('linea')
+
+        #Solo medimos el tiempo del procesamiento, no el de la decodificacion del video
+        inicio = time.perf_counter()
+        image_area = cv2.bitwise_and(frame, frame, mask=imAux)
+        fgmask = limpiarMascara(fgbg.apply(image_area))
+        fgmask = cv2.morphologyEx(fgmask, cv2.MORPH_OPEN, kernel)
+        if conf['cerrar']:
+            fgmask = cv2.morphologyEx(fgmask, cv2.MORPH_CLOSE, kernel)
+        if conf['dilatar']:
+            fgmask = cv2.dilate(fgmask, None, iterations=conf['dilatar'])
+
+        cnts = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0]
+        alerta = False
+        for cnt in cnts:
+            if cv2.contourArea(cnt) > areaMin:
+                alerta = True
+                x, y, w, h = cv2.boundingRect(cnt)
+                if conf['eje'] == 'x' and abs((x + w) - linea) < conf['tolerancia']:
+                    conteo = conteo + 1
+                elif conf['eje'] == 'y' and abs((y + h//2) - linea) < conf['tolerancia']:
+                    conteo = conteo + 1
+        if conf['eje'] is None and alerta and not alertaAnterior:
+            conteo = conteo + 1
+        alertaAnterior = alerta
+        tiempo += time.perf_counter() - inicio
+        frames = frames + 1
+
+    cap.release()
+    memoria = None
+    if resource is not None:
+        #ru_maxrss esta en KB en Linux; cada corrida vive en su propio proceso
+        memoria = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    fps = frames / tiempo if tiempo > 0 else 0.0
+    return nombreVideo, nombreSustractor, frames, fps, memoria, conteo
+
+#------------------------------ Funcion para leer los conteos reales -----------------------------
+def leerVerdad(archivo):
+    if not os.path.exists(archivo):
+        print('No se encontro', archivo, '- no se calculara la precision del conteo')
+        return {}
+    with open(archivo, 'r', encoding='utf8') as f:
+        return json.load(f)
+
+def precision(conteo, real):
+    if real is None:
+        return None
+    if real == 0:
+        return 1.0 if conteo == 0 else 0.0
+    return max(0.0, 1 - abs(conteo - real) / real)
+
+#----------------------------------------------- Funcion principal--------------------------------
+def main(sustractores = None, videos = None):
+    sustractores = sustractores or list(SUSTRACTORES)
+    videos = videos or list(VIDEOS)
+    verdad = leerVerdad(archivoVerdad)
+
+    pruebas = []
+    for nombreVideo in videos:
+        if not os.path.exists(VIDEOS[nombreVideo]['ruta']):
+            print('Video no encontrado, se omite:', VIDEOS[nombreVideo]['ruta'])
+            continue
+        for nombreSustractor in sustractores:
+            pruebas.append((nombreVideo, nombreSustractor))
+
+    #Un proceso nuevo por prueba para que el pico de memoria no se mezcle entre sustractores
+    resultados = []
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        for r in pool.starmap(contarVideo, pruebas, chunksize=1):
+            resultados.append(r)
+
+    print('{:<16}{:<10}{:>8}{:>10}{:>12}{:>8}{:>7}{:>11}'.format(
+        'Video', 'Metodo', 'Frames', 'FPS', 'Memoria MB', 'Conteo', 'Real', 'Precision'))
+    for nombreVideo, nombreSustractor, frames, fps, memoria, conteo in resultados:
+        real = verdad.get(nombreVideo)
+        prec = precision(conteo, real)
+        print('{:<16}{:<10}{:>8}{:>10.1f}{:>12}{:>8}{:>7}{:>11}'.format(
+            nombreVideo, nombreSustractor, frames, fps,
+            'n/d' if memoria is None else '{:.1f}'.format(memoria),
+            conteo, '-' if real is None else real,
+            '-' if prec is None else '{:.1%}'.format(prec)))
+    return resultados
+
+if __name__ == "__main__":
+    main()
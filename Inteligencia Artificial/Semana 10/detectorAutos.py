@@ -1,13 +1,28 @@
 import cv2
 import numpy as np
 import imutils
+from sustractores import crearSustractor, limpiarMascara
+from velocidad import EstimadorVelocidad
+from mapaCalor import MapaCalor
 
 cam = cv2.VideoCapture('video.mp4')
-#Algoritmo de substraccion de fondo
-fgbg = cv2.bgsegm.createBackgroundSubtractorMOG()
+#Algoritmo de substraccion de fondo ('MOG', 'MOG2', 'KNN', 'GMG' o 'PROMEDIO')
+#Para compararlos en velocidad, memoria y conteo usa benchmarkSustractores.py
+metodo = 'MOG'
+fgbg = crearSustractor(metodo)
 kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
 car_counter = 0
 
+#Calibracion de la carretera para estimar velocidades: 4 puntos del frame redimensionado
+#(sup-izq, sup-der, inf-izq, inf-der) y las medidas reales en metros del rectangulo que forman
+puntosCarretera = [[330, 16], [720, 16], [330, 445], [720, 445]]
+anchoCarretera, largoCarretera = 7.0, 30.0
+fps = cam.get(cv2.CAP_PROP_FPS) or 30
+estimador = EstimadorVelocidad(puntosCarretera, anchoCarretera, largoCarretera, fps)
+
+#Mapa de calor del trafico: rejilla de 4x4 pixeles, instantanea PNG cada 300 frames
+mapa = None
+
 
 while True:
     ret, frame = cam.read()
@@ -30,26 +45,41 @@ while True:
     image_area = cv2.bitwise_and(frame, frame, mask=imAux)
 
     #Extraccion de elemeto auto sobre image_area
-    fgmask = fgbg.apply(image_area)
+    fgmask = limpiarMascara(fgbg.apply(image_area))
     #Mejorar la imagen para que sea solida en contorno y relleno
     fgmask = cv2.morphologyEx(fgmask, cv2.MORPH_OPEN, kernel)
     fgmask = cv2.morphologyEx(fgmask, cv2.MORPH_CLOSE, kernel)
     fgmask = cv2.dilate(fgmask, None, iterations=5)    
 
+    #Acumulamos la mascara en el mapa de calor
+    if mapa is None:
+        mapa = MapaCalor(frame.shape[0], frame.shape[1], celda=4, periodo=300)
+    mapa.agregarMascara(fgmask)
+
     #Encontramos los contornos presentes de fgmask, para luego basándonos
     # en su área poder determinar si existe movimiento (autos)
     cnts = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0]
     #Ciclo para contar los autos que pasan por la linea
+    cajas = []
     for cnt in cnts:
         if cv2.contourArea(cnt) > 500:
             x, y, w, h = cv2.boundingRect(cnt)
             cv2.rectangle(frame, (x,y), (x+w,y+h), (0,255,255), 1)
+            cajas.append((x, y, w, h))
     
             #Dibujar una linea verde cada que el auto pasa en las coordenadas de la linea amarilla
             if 440 < (x + w) < 460:
                 car_counter = car_counter + 1
                 cv2.line(frame, (450, 16), (450, 445), (0, 255, 0), 3)
 
+    #Velocidad de todos los autos del frame en una sola llamada, usando el centro de cada caja
+    cajas = np.array(cajas, dtype=np.float32).reshape(-1, 4)
+    ids, velocidades = estimador.actualizar(cajas[:, :2] + cajas[:, 2:] / 2)
+    for (x, y, w, h), kmh in zip(cajas, velocidades):
+        if kmh > 0:
+            cv2.putText(frame, '{:.0f} km/h'.format(kmh), (int(x), int(y) - 5),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,255), 1)
+
     # Visualización del conteo de autos
     cv2.drawContours(frame, [area_pts], -1, (255, 0, 255), 2)
     cv2.line(frame, (450, 16), (450, 445), (0, 255, 255), 1)
@@ -65,5 +95,8 @@ while True:
     k = cv2.waitKey(1) & 0xFF
     if k == 27 : break
 
+if mapa is not None:
+    mapa.guardar('mapa_calor.png')
+    mapa.guardar('mapa_calor.npy')
 cam.release()
 cv2.destroyAllWindows()
\ No newline at end of file
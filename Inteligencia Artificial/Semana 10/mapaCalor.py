@@ -0,0 +1,59 @@
+#------------------------------ Importamos las librerias ----------------------------------------
+import os
+import cv2
+import numpy as np
+
+#------------------------------- Acumulador del mapa de calor ------------------------------------
+class MapaCalor():
+    #Acumula por donde pasa el trafico en una rejilla de float32 de (alto/celda, ancho/celda).
+    #Todo se hace con operaciones de OpenCV/NumPy (sin ciclos de Python), el costo por frame
+    #es proporcional al numero de pixeles y se puede dejar encendido siempre.
+    #Si 'periodo' > 0 se guarda una instantanea cada 'periodo' frames con el nombre 'patron'
+    #(la extension .png o .npy decide el formato).
+    def __init__(self, alto, ancho, celda = 4, periodo = 0, patron = 'mapa_calor_{:06d}.png'):
+        self.celda = celda
+        self.tam = (int(np.ceil(ancho / celda)), int(np.ceil(alto / celda)))   #(ancho, alto) como en cv2
+        self.acumulado = np.zeros((self.tam[1], self.tam[0]), dtype=np.float32)
+        self.periodo = periodo
+        self.patron = patron
+        self.frames = 0
+
+    def agregarMascara(self, mascara):
+        #Suma el promedio de la mascara (0/255) dentro de cada celda
+        reducida = cv2.resize(mascara, self.tam, interpolation=cv2.INTER_AREA)
+        cv2.accumulate(reducida, self.acumulado)
+        self._contarFrame()
+
+    def agregarPuntos(self, puntos, peso = 1.0):
+        #Suma 'peso' en la celda de cada punto (x, y) en pixeles, por ejemplo los centroides
+        puntos = np.asarray(puntos).reshape(-1, 2)
+        if len(puntos):
+            cx = np.clip((puntos[:, 0] // self.celda).astype(np.int64), 0, self.tam[0] - 1)
+            cy = np.clip((puntos[:, 1] // self.celda).astype(np.int64), 0, self.tam[1] - 1)
+            votos = np.bincount(cy * self.tam[0] + cx, minlength=self.acumulado.size)
+            self.acumulado += (votos * peso).astype(np.float32).reshape(self.acumulado.shape)
+        self._contarFrame()
+
+    def colorear(self):
+        #Regresa el mapa normalizado a 0-255 con la paleta JET
+        maximo = self.acumulado.max()
+        escala = 255.0 / maximo if maximo > 0 else 0.0
+        gris = cv2.convertScaleAbs(self.acumulado, alpha=escala)
+        return cv2.applyColorMap(gris, cv2.COLORMAP_JET)
+
+    def superponer(self, frame, alfa = 0.4):
+        #Mezcla el mapa de calor (escalado al tamaño del frame) sobre el frame
+        color = cv2.resize(self.colorear(), (frame.shape[1], frame.shape[0]), interpolation=cv2.INTER_LINEAR)
+        return cv2.addWeighted(frame, 1 - alfa, color, alfa, 0)
+
+    def guardar(self, ruta):
+        #.npy guarda los valores crudos, cualquier otra extension guarda la imagen en color
+        if os.path.splitext(ruta)[1].lower() == '.npy':
+            np.save(ruta, self.acumulado)
+        else:
+            cv2.imwrite(ruta, self.colorear())
+
+    def _contarFrame(self):
+        self.frames = self.frames + 1
+        if self.periodo > 0 and self.frames % self.periodo == 0:
+            self.guardar(self.patron.format(self.frames))
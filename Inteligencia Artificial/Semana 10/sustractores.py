@@ -0,0 +1,53 @@
+#------------------------------ Importamos las librerias ----------------------------------------
+import cv2
+import numpy as np
+
+#---------------------- Modelo de fondo por promedio movil (solo NumPy) ---------------------------
+class PromedioMovil():
+    #Mantiene un fondo en float32 que se actualiza con cada frame:
+    #   fondo = fondo + alfa * (gris - fondo)
+    #Los pixeles que se alejan mas de 'umbral' del fondo se marcan como movimiento (255)
+    def __init__(self, alfa = 0.05, umbral = 25):
+        self.alfa = alfa
+        self.umbral = umbral
+        self.fondo = None
+        self.dif = None
+        self.mascara = None
+
+    def apply(self, frame):
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        #El primer frame se toma como fondo y reservamos los buffers una sola vez
+        if self.fondo is None or self.fondo.shape != frame.shape:
+            self.fondo = frame.astype(np.float32)
+            self.dif = np.empty(frame.shape, dtype=np.float32)
+            self.mascara = np.zeros(frame.shape, dtype=np.uint8)
+            return self.mascara.copy()
+
+        np.subtract(frame, self.fondo, out=self.dif, dtype=np.float32)
+        np.greater(np.abs(self.dif), self.umbral, out=self.mascara.view(bool))
+        #Actualizamos el fondo reutilizando el buffer de la diferencia
+        self.dif *= self.alfa
+        self.fondo += self.dif
+        return self.mascara * np.uint8(255)
+
+#---------------------------- Sustractores disponibles por nombre --------------------------------
+SUSTRACTORES = {
+    'MOG': lambda: cv2.bgsegm.createBackgroundSubtractorMOG(),
+    'MOG2': lambda: cv2.createBackgroundSubtractorMOG2(detectShadows = True),
+    'KNN': lambda: cv2.createBackgroundSubtractorKNN(detectShadows = True),
+    'GMG': lambda: cv2.bgsegm.createBackgroundSubtractorGMG(),
+    'PROMEDIO': lambda: PromedioMovil(),
+}
+
+def crearSustractor(nombre):
+    #Regresa un sustractor de fondo nuevo, todos exponen el metodo apply(frame)
+    nombre = nombre.upper()
+    if nombre not in SUSTRACTORES:
+        raise ValueError('Sustractor desconocido: ' + nombre + ' (opciones: ' + ', '.join(SUSTRACTORES) + ')')
+    return SUSTRACTORES[nombre]()
+
+def limpiarMascara(fgmask):
+    #MOG2 y KNN marcan las sombras con 127, las descartamos para que todos den una mascara binaria
+    _, fgmask = cv2.threshold(fgmask, 200, 255, cv2.THRESH_BINARY)
+    return fgmask
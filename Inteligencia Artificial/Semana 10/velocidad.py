@@ -0,0 +1,97 @@
+#------------------------------ Importamos las librerias ----------------------------------------
+import cv2
+import numpy as np
+
+#------------------------ Estimador de velocidad sobre el plano de la carretera --------------------
+class EstimadorVelocidad():
+    #Calibramos el plano con 4 puntos de la imagen (mismo orden que en
+    #perspective_transformation_points.py: sup-izq, sup-der, inf-izq, inf-der) que en la
+    #carretera forman un rectangulo de 'ancho' x 'largo' metros.
+    #Todos los autos activos se actualizan juntos con operaciones de NumPy.
+    def __init__(self, puntos, ancho, largo, fps, alfa = 0.3, maxDist = 3.0, maxPerdidos = 5):
+        pts1 = np.float32(puntos)
+        pts2 = np.float32([[0, 0], [ancho, 0], [0, largo], [ancho, largo]])
+        self.M = cv2.getPerspectiveTransform(pts1, pts2)
+        self.fps = fps
+        self.alfa = alfa                #Suavizado exponencial de la velocidad
+        self.maxDist = maxDist          #Metros maximos que un auto se mueve por frame
+        self.maxPerdidos = maxPerdidos  #Frames sin detectar antes de borrar el auto
+
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.pos = np.zeros((0, 2), dtype=np.float32)       #Posicion en metros
+        self.vel = np.zeros(0, dtype=np.float32)            #Velocidad suavizada en km/h
+        self.perdidos = np.zeros(0, dtype=np.int32)
+        self.siguienteId = 0
+
+    def aMetros(self, centroides):
+        #Convierte centroides en pixeles (N, 2) a metros sobre el plano de la carretera
+        centroides = np.asarray(centroides, dtype=np.float32).reshape(-1, 1, 2)
+        if len(centroides) == 0:
+            return np.zeros((0, 2), dtype=np.float32)
+        return cv2.perspectiveTransform(centroides, self.M).reshape(-1, 2)
+
+    def actualizar(self, centroides):
+        #Recibe los centroides del frame y regresa (ids, velocidades km/h), uno por centroide
+        nuevos = self.aMetros(centroides)
+        n, k = len(nuevos), len(self.pos)
+        asignado = np.full(n, -1, dtype=np.int64)
+
+        #Una pista perdida k frames recorre hasta k+1 frames de distancia cuando reaparece
+        frames = self.perdidos + 1
+        if n > 0 and k > 0:
+            #Emparejamos vecinos mas cercanos mutuos que esten a menos de maxDist por frame
+            dist = np.linalg.norm(nuevos[:, None, :] - self.pos[None, :, :], axis=2)
+            pista = dist.argmin(axis=1)
+            deteccion = dist.argmin(axis=0)
+            mutuo = (deteccion[pista] == np.arange(n)) & (dist[np.arange(n), pista] < self.maxDist * frames[pista])
+            asignado[mutuo] = pista[mutuo]
+
+        #Velocidad instantanea de las pistas emparejadas y suavizado exponencial
+        ok = asignado >= 0
+        pistas = asignado[ok]
+        if len(pistas):
+            metrosPorFrame = np.linalg.norm(nuevos[ok] - self.pos[pistas], axis=1) / frames[pistas]
+            kmh = metrosPorFrame * self.fps * 3.6
+            previas = self.vel[pistas]
+            self.vel[pistas] = np.where(previas > 0, previas + self.alfa * (kmh - previas), kmh)
+            self.pos[pistas] = nuevos[ok]
+
+        #Envejecemos las pistas que no aparecieron y borramos las viejas
+        vistas = np.zeros(k, dtype=bool)
+        vistas[pistas] = True
+        self.perdidos = np.where(vistas, 0, self.perdidos + 1)
+        vivas = self.perdidos <= self.maxPerdidos
+        reindice = np.cumsum(vivas) - 1
+        asignado[ok] = reindice[pistas]
+        self.ids, self.pos, self.vel, self.perdidos = self.ids[vivas], self.pos[vivas], self.vel[vivas], self.perdidos[vivas]
+
+        #Las detecciones sin pareja crean pistas nuevas
+        libres = ~ok
+        cuantos = int(libres.sum())
+        if cuantos:
+            asignado[libres] = len(self.ids) + np.arange(cuantos)
+            self.ids = np.concatenate([self.ids, self.siguienteId + np.arange(cuantos)])
+            self.pos = np.concatenate([self.pos, nuevos[libres]])
+            self.vel = np.concatenate([self.vel, np.zeros(cuantos, dtype=np.float32)])
+            self.perdidos = np.concatenate([self.perdidos, np.zeros(cuantos, dtype=np.int32)])
+            self.siguienteId += cuantos
+
+        return self.ids[asignado], self.vel[asignado]
+
+#------------------------------------------ Comprobacion ------------------------------------------
+def comprobar():
+    #Un auto a velocidad constante que no se detecta en un frame debe reaparecer con la misma
+    #velocidad, no con la distancia de dos frames tomada como uno solo
+    puntos = [[0, 0], [100, 0], [0, 100], [100, 100]]  #1 px = 0.1 m
+    fps, pasoPx = 30, 5                                #0.5 m por frame = 54 km/h
+    continuo = EstimadorVelocidad(puntos, 10, 10, fps)
+    conHueco = EstimadorVelocidad(puntos, 10, 10, fps)
+    for i in range(6):
+        centro = [[10 + pasoPx * i, 50]]
+        _, vContinuo = continuo.actualizar(centro)
+        _, vHueco = conHueco.actualizar([] if i == 3 else centro)
+    print('Continuo: {:.1f} km/h, perdiendo un frame: {:.1f} km/h'.format(vContinuo[0], vHueco[0]))
+    assert abs(vContinuo[0] - 54) < 0.5 and abs(vHueco[0] - vContinuo[0]) < 0.5
+
+if __name__ == "__main__":
+    comprobar()
@@ -3,6 +3,7 @@ import numpy as np
 import cv2
 import Person
 import time
+from mapaCalor import MapaCalor
 
 
 
@@ -65,6 +66,9 @@ pts_L4 = pts_L4.reshape((-1,1,2))
 #Background Substractor
 fgbg = cv2.createBackgroundSubtractorMOG2(detectShadows = True)
 
+#Heatmap of where people walk (frames are cropped 20 px on the left), PNG snapshot every 300 frames
+heatmap = MapaCalor(int(h), int(w) - 20, celda=4, periodo=300)
+
 #Structuring elements for morphographic filters
 kernelOp = np.ones((3,3),np.uint8)
 kernelOp2 = np.ones((5,5),np.uint8)
@@ -113,6 +117,7 @@ while(cap.isOpened()):
         print(('ARRIBA:'),cnt_up+count_up)
         print (('ABAJO:'),cnt_down+count_down)
         break
+    heatmap.agregarMascara(mask2)
     #################
     #   CONTOURS   #
     #################
@@ -276,6 +281,8 @@ while(cap.isOpened()):
 #################
 #   CLOSING    #
 #################
+heatmap.guardar('heatmap.png')
+heatmap.guardar('heatmap.npy')
 cap.release()
 cv2.waitKey()
 cv2.destroyAllWindows()
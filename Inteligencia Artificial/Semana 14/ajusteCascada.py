@@ -0,0 +1,207 @@
+import cv2
+import os
+import json
+import time
+import itertools
+import numpy as np
+
+# Busca en rejilla los parámetros de detectMultiScale (scaleFactor, minNeighbors, minSize,
+# maxSize) de una cascada sobre imágenes etiquetadas, dibuja el frente de Pareto de
+# velocidad contra precisión/recall y guarda la configuración elegida en un .json que los
+# scripts cargan con cargarParametros().
+#
+# Las etiquetas usan el formato de opencv_createsamples (el mismo de pos.lst y neg.lst):
+#   p/objeto_0.jpg 1 0 0 38 46      -> ruta, número de objetos y una caja x y w h por objeto
+#   n/objeto_0.jpg                  -> imagen sin objetos
+cascada = 'haarcascade_fullbody.xml'
+listas = ['pos.lst', 'neg.lst']
+salida = 'parametrosCascada.json'
+grafica = 'paretoCascada.png'
+borde = 0 # Pixeles que se agregan alrededor de cada imagen (útil si las muestras son recortes del objeto)
+recallMinimo = 0.9
+precisionMinima = 0.5
+iouMinimo = 0.5
+hilos = 1 # cv2.setNumThreads durante la medición; None deja los que OpenCV elija
+
+scaleFactors = [1.05, 1.1, 1.2, 1.3, 1.5, 2.0, 5.0]
+minNeighbors = [0, 1, 3, 5, 10, 30, 91]
+minSizes = [None, (30,30), (70,78)]
+maxSizes = [None, (200,200)]
+
+def cargarParametros(ruta='parametrosCascada.json', **porDefecto):
+    # Regresa los argumentos de detectMultiScale guardados por este script, o los valores
+    # por defecto si todavía no existe el archivo:
+    #   parametros = cargarParametros('parametrosCascada.json', scaleFactor=1.1, minNeighbors=4)
+    #   objetos = clasificador.detectMultiScale(gray, **parametros)
+    parametros = dict(porDefecto)
+    if os.path.exists(ruta):
+        with open(ruta) as archivo:
+            guardados = json.load(archivo)
+        parametros = {k: guardados.get(k) for k in ('scaleFactor', 'minNeighbors', 'minSize', 'maxSize')}
+    return {k: tuple(v) if isinstance(v, list) else v for k, v in parametros.items() if v is not None}
+
+def leerLista(ruta):
+    # Regresa [(ruta de la imagen, cajas (N, 4))]; las rutas son relativas a la lista
+    carpeta = os.path.dirname(ruta)
+    muestras = []
+    with open(ruta) as archivo:
+        for linea in archivo:
+            partes = linea.split()
+            if not partes:
+                continue
+            n = int(partes[1]) if len(partes) > 1 else 0
+            cajas = np.array(partes[2:2 + 4 * n], dtype=np.int32).reshape(-1, 4)
+            muestras.append((os.path.join(carpeta, partes[0]), cajas))
+    return muestras
+
+def iou(a, b):
+    # IoU de todas las cajas de 'a' (N, 4) contra todas las de 'b' (M, 4) -> (N, M)
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)[:, None]
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)[None]
+    ancho = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    alto = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    interseccion = np.clip(ancho, 0, None) * np.clip(alto, 0, None)
+    return interseccion / (a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - interseccion)
+
+def aciertos(reales, detectadas):
+    # Emparejamiento voraz: cada caja real cuenta a lo más una detección con IoU >= iouMinimo
+    if len(reales) == 0 or len(detectadas) == 0:
+        return 0
+    matriz = iou(reales, detectadas)
+    total = 0
+    while matriz.size and matriz.max() >= iouMinimo:
+        i, j = np.unravel_index(matriz.argmax(), matriz.shape)
+        matriz[i, :] = -1
+        matriz[:, j] = -1
+        total = total + 1
+    return total
+
+def evaluar(clasificador, imagenes, reales, parametros):
+    encontradas = detecciones = 0
+    inicio = time.perf_counter()
+    salidas = [clasificador.detectMultiScale(imagen, **parametros) for imagen in imagenes]
+    tiempo = time.perf_counter() - inicio
+    for cajas, detectadas in zip(reales, salidas):
+        encontradas += aciertos(cajas, detectadas)
+        detecciones += len(detectadas)
+    totalReales = sum(len(cajas) for cajas in reales)
+    # Sin detecciones la precisión es 0: si valiera 1, las combinaciones que no detectan nada
+    # quedarían en el frente de Pareto como si fueran perfectas
+    return {
+        'imagenesPorSegundo': len(imagenes) / max(tiempo, 1e-9),
+        'recall': encontradas / totalReales if totalReales else 1.0,
+        'precision': encontradas / detecciones if detecciones else 0.0,
+    }
+
+def frentePareto(resultados, metricas=('imagenesPorSegundo', 'recall', 'precision')):
+    # Índices de las combinaciones que ninguna otra supera en todas las métricas a la vez
+    puntos = np.array([[r[m] for m in metricas] for r in resultados])
+    frente = []
+    for i, p in enumerate(puntos):
+        dominado = np.any(np.all(puntos >= p, axis=1) & np.any(puntos > p, axis=1))
+        if not dominado:
+            frente.append(i)
+    return frente
+
+def graficar(resultados, frente, elegido, ruta, tam=(480,360), margen=50):
+    # Dos paneles con OpenCV: velocidad contra recall y velocidad contra precisión.
+    # Gris = todas las combinaciones, rojo = frente de Pareto de cada panel, negro = frente
+    # de Pareto con las tres métricas, verde = configuración elegida
+    ancho, alto = tam
+    velocidad = np.array([r['imagenesPorSegundo'] for r in resultados])
+    maxVelocidad = velocidad.max() * 1.05
+    paneles = []
+    for metrica in ('recall', 'precision'):
+        panel = np.full((alto, ancho, 3), 255, dtype=np.uint8)
+        cv2.line(panel, (margen, alto - margen), (ancho - 10, alto - margen), (0,0,0), 1)
+        cv2.line(panel, (margen, 10), (margen, alto - margen), (0,0,0), 1)
+        cv2.putText(panel, 'imagenes/s (max {:.0f})'.format(maxVelocidad), (margen, alto - 15), 1, 1, (0,0,0), 1, cv2.LINE_AA)
+        cv2.putText(panel, metrica, (5, 25), 1, 1, (0,0,0), 1, cv2.LINE_AA)
+        def punto(i):
+            x = margen + velocidad[i] / maxVelocidad * (ancho - margen - 10)
+            y = alto - margen - resultados[i][metrica] * (alto - margen - 10)
+            return int(x), int(y)
+        for i in range(len(resultados)):
+            cv2.circle(panel, punto(i), 3, (180,180,180), -1)
+        for i in frente:
+            cv2.circle(panel, punto(i), 4, (0,0,0), -1)
+        ordenados = sorted(frentePareto(resultados, ('imagenesPorSegundo', metrica)), key=lambda i: velocidad[i])
+        for a, b in zip(ordenados, ordenados[1:]):
+            cv2.line(panel, punto(a), punto(b), (0,0,220), 1, cv2.LINE_AA)
+        for i in ordenados:
+            cv2.circle(panel, punto(i), 4, (0,0,220), -1)
+        cv2.circle(panel, punto(elegido), 7, (0,180,0), 2)
+        paneles.append(panel)
+    cv2.imwrite(ruta, cv2.hconcat(paneles))
+
+def main():
+    if hilos is not None:
+        cv2.setNumThreads(hilos)
+    clasificador = cv2.CascadeClassifier(cascada)
+    if clasificador.empty():
+        print('No se pudo cargar', cascada)
+        return
+
+    faltantes = [lista for lista in listas if not os.path.exists(lista)]
+    if faltantes:
+        print('No existe', ', '.join(faltantes))
+        print('Crea las listas con el formato de opencv_createsamples, una imagen por línea:')
+        print('  p/objeto_0.jpg 1 0 0 38 46    (imagen con 1 objeto en la caja x y w h)')
+        print('  n/objeto_0.jpg                (imagen sin objetos)')
+        return
+
+    # Las imágenes se leen una sola vez y se reutilizan en todas las combinaciones
+    imagenes, reales = [], []
+    for lista in listas:
+        for ruta, cajas in leerLista(lista):
+            imagen = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
+            if imagen is None:
+                continue
+            if borde:
+                imagen = cv2.copyMakeBorder(imagen, borde, borde, borde, borde, cv2.BORDER_REPLICATE)
+                cajas = cajas + np.array([borde, borde, 0, 0], dtype=np.int32)
+            imagenes.append(imagen)
+            reales.append(cajas)
+    print('Imágenes: {} ({} objetos)'.format(len(imagenes), sum(len(c) for c in reales)))
+    if not imagenes:
+        print('No se pudo leer ninguna imagen de', ', '.join(listas))
+        return
+
+    resultados = []
+    combinaciones = list(itertools.product(scaleFactors, minNeighbors, minSizes, maxSizes))
+    for n, (scaleFactor, vecinos, minSize, maxSize) in enumerate(combinaciones):
+        if minSize is not None and maxSize is not None and (minSize[0] > maxSize[0] or minSize[1] > maxSize[1]):
+            continue
+        parametros = {'scaleFactor': scaleFactor, 'minNeighbors': vecinos, 'minSize': minSize, 'maxSize': maxSize}
+        resultado = evaluar(clasificador, imagenes, reales, {k: v for k, v in parametros.items() if v is not None})
+        resultado.update(parametros)
+        resultados.append(resultado)
+        print('\r{}/{}'.format(n + 1, len(combinaciones)), end='', flush=True)
+    print()
+
+    frente = frentePareto(resultados)
+    # Del frente elegimos la más rápida que cumple recallMinimo y precisionMinima; si
+    # ninguna los cumple, la de mejor F1
+    validos = [i for i in frente if resultados[i]['recall'] >= recallMinimo and resultados[i]['precision'] >= precisionMinima]
+    if validos:
+        elegido = max(validos, key=lambda i: resultados[i]['imagenesPorSegundo'])
+    else:
+        print('Ninguna combinación cumple recall >= {} y precisión >= {}, se elige la de mejor F1'.format(recallMinimo, precisionMinima))
+        f1 = lambda r: 2 * r['recall'] * r['precision'] / max(r['recall'] + r['precision'], 1e-9)
+        elegido = max(frente, key=lambda i: f1(resultados[i]))
+
+    print('{:>12}{:>14}{:>12}{:>12}{:>10}{:>10}{:>12}'.format('scaleFactor', 'minNeighbors', 'minSize', 'maxSize', 'img/s', 'Recall', 'Precision'))
+    for i in sorted(frente, key=lambda i: -resultados[i]['imagenesPorSegundo']):
+        r = resultados[i]
+        print('{:>12}{:>14}{:>12}{:>12}{:>10.1f}{:>10.1%}{:>12.1%}{}'.format(r['scaleFactor'], r['minNeighbors'],
+            str(r['minSize']), str(r['maxSize']), r['imagenesPorSegundo'], r['recall'], r['precision'],
+            '  <- elegida' if i == elegido else ''))
+
+    configuracion = dict(resultados[elegido], cascada=cascada)
+    with open(salida, 'w') as archivo:
+        json.dump(configuracion, archivo, indent=2)
+    graficar(resultados, frente, elegido, grafica)
+    print('Configuración guardada en', salida, '- gráfica en', grafica)
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,17 @@
 import cv2
 import numpy as np
+from ajusteCascada import cargarParametros
 
 cam = cv2.VideoCapture(1)
 human_cascade = cv2.CascadeClassifier('haarcascade_fullbody.xml')
+# Parámetros de detectMultiScale encontrados con ajusteCascada.py (o los de siempre si no se ha ejecutado)
+parametros = cargarParametros('parametrosCascada.json', scaleFactor = 1.1, minNeighbors = 4)
 
 while True:
     ret, frame = cam.read()
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
-    human = human_cascade.detectMultiScale(gray,
-	1.1, 4)
+    human = human_cascade.detectMultiScale(gray, **parametros)
 
     for (x,y,w,h) in human:
 	    cv2.rectangle(frame,(x,y),(x+w,y+h),(0,0,220),2)
@@ -1,16 +1,26 @@
 #------------------------------ Importamos las librerias ----------------------------------------
 import cv2
+import time
 import numpy as np
 import SeguimientoManos as sm  #Programa que contiene la deteccion y seguimiento de manos
+import tuberiaManos as tm  #Camara y deteccion en sus propios hilos
+import filtroPuntos as fp  #Filtros Uno Euro y Kalman para los puntos de la mano
 import autopy  #Libreria que nos va a permitir manipular el mouse
 
 #---------------------------------Declaracion de variables---------------------------------------
 anchocam, altocam = 640, 480
 cuadro = 100 #Rango donde podemos interactura
 anchopanta, altopanta = autopy.screen.size() #Obtenemos las dimensiones de nuestra pantalla
-sua = 5
-pubix, pubiy = 0,0
-cubix, cubiy = 0,0
+#Filtro de los 21 puntos: quieto quita el temblor y rapido casi no agrega retraso (ver filtroPuntos.py)
+filtro = fp.filtrounoeuro(frecuenciaMin=1.0, beta=0.02)
+#filtro = fp.filtrokalman(ruidoMedicion=4.0, ruidoAceleracion=2e5)
+#Extrapola los puntos hasta ahora para compensar la latencia de la deteccion. Reduce el retraso
+#al mover la mano (~70 -> ~35 ms en benchmarkFiltros.py), pero extrapolar el temblor lo aumenta
+#y el cursor lo multiplica por ~anchopanta/(anchocam-2*cuadro). Por eso solo se predice arriba
+#de velocidadMinima px/s del filtro (150 por defecto, mano quieta = sin prediccion); si aun asi
+#el cursor tiembla en reposo sube velocidadMinima o pon prediccion = False
+prediccion = True
+maxPrediccion = 0.1  #Segundos maximos a extrapolar
 #print(anchopanta, anchocam)
 
 #----------------------------------- Lectura de la camara----------------------------------------
@@ -20,43 +30,55 @@ cap.set(4,altocam)
 
 #------------------------------------ Declaramos el detector -----------------------------
 detector = sm.detectormanos(maxManos=1) #Ya que solo vamos a utilizar una mano
+#El mouse responde con la deteccion mas reciente sin esperar a que MediaPipe termine cada frame
+tuberia = tm.tuberiamanos(cap, detector)
 
 while True:
     #----------------- Vamos a encontrar los puntos de la mano -----------------------------
-    ret, frame = cap.read()
-    frame = detector.encontrarmanos(frame)  #Encontramos las manos
-    lista, bbox = detector.encontrarposicion(frame) #Mostramos las posiciones
+    datos = tuberia.siguiente()
+    if datos is None:
+        break
+    frame, manos = datos  #Frame mas nuevo y las manos de la deteccion mas reciente
+    tuberia.dibujar(frame)
+    manos.dibujar(frame, colores=[[0,0,0]]) #Mostramos las posiciones
+
+    #------------------------------- Filtramos los puntos ----------------------------------
+    if len(manos) == 0:
+        filtro.reiniciar()
+    elif tuberia.nuevas:  #Solo cuando llega una deteccion nueva, con el tiempo en que se capturo
+        filtro.filtrar(manos.puntos[0], tuberia.tiempoManos)
 
     #-----------------Obtener la punta del dedo indice y corazon----------------------------
-    if len(lista) != 0:
-        x1, y1 = lista[8][1:]                  #Extraemos las coordenadas del dedo indice
-        x2, y2 = lista[12][1:]                 #Extraemos las coordenadas del dedo corazon
+    if len(manos) != 0:
+        puntos = filtro.predecir(time.perf_counter(), maxPrediccion) if prediccion else filtro.x
+        x1, y1 = puntos[8, :2].astype(int).tolist()   #Extraemos las coordenadas del dedo indice
+        x2, y2 = puntos[12, :2].astype(int).tolist()  #Extraemos las coordenadas del dedo corazon
         #print(x1,y1,x2,y2)
 
         #----------------- Comprobar que dedos estan arriba --------------------------------
-        dedos = detector.dedosarriba() #Contamos con 5 posiciones nos indica si levanta cualquier dedo
+        dedos = manos.dedos[0] #Contamos con 5 posiciones nos indica si levanta cualquier dedo
         #print(dedos)
         cv2.rectangle(frame, (cuadro, cuadro), (anchocam - cuadro, altocam - cuadro), (0, 0, 0), 2)  # Generamos cuadro
         #-----------------Modo movimiento: solo dedo indice-------------------------------------
         if dedos[1]== 1 and dedos[2] == 0:  #Si el indice esta arriba pero el corazon esta abajo
 
             #-----------------> Modo movimiento conversion a las pixeles de mi pantalla-------------
-            x3 = np.interp(x1, (cuadro,anchocam-cuadro), (0,anchopanta))
-            y3 = np.interp(y1, (cuadro, altocam-cuadro), (0, altopanta))
-
-            #------------------------------- Suavizado los valores ----------------------------------
-            cubix = pubix + (x3 - pubix) / sua #Ubicacion actual = ubi anterior + x3 - Pa dividida el valor suavizado
-            cubiy = pubiy + (y3 - pubiy) / sua
+            #Los puntos ya vienen filtrados, ya no se suaviza aqui
+            x3 = np.interp(puntos[8, 0], (cuadro,anchocam-cuadro), (0,anchopanta))
+            y3 = np.interp(puntos[8, 1], (cuadro, altocam-cuadro), (0, altopanta))
 
             #-------------------------------- Mover el Mouse ---------------------------------------
-            autopy.mouse.move(anchopanta - cubix,cubiy) #Enviamos las coordenadas al Mouse
+            #Fuera del cuadro np.interp regresa justo el ancho o el alto de la pantalla, que autopy
+            #rechaza por estar fuera de ella; lo dejamos en el ultimo pixel
+            xm = min(max(anchopanta - x3, 0), anchopanta - 1)
+            ym = min(max(y3, 0), altopanta - 1)
+            autopy.mouse.move(xm,ym) #Enviamos las coordenadas al Mouse
             cv2.circle(frame, (x1,y1), 10, (0,0,0), cv2.FILLED)
-            pubix, pubiy = cubix, cubiy
 
         #----------------------------- Comprobar si esta en modo click -------------------------
         if dedos[1] == 1 and dedos[2] == 1:  # Si el indice esta arriba y el corazon tambien
             # --------------->Modo click: encontrar la distancia entre ellos-------------------------
-            longitud, frame, linea = detector.distancia(8,12,frame) #Nos entrega la distancia entre el punto 8 y 12
+            longitud, frame, linea = manos.distancia(8,12,frame) #Nos entrega la distancia entre el punto 8 y 12
             print(longitud)
             if longitud < 30:
                 cv2.circle(frame, (linea[4],linea[5]), 10, (0,255,0), cv2.FILLED)
@@ -69,5 +91,7 @@ while True:
     k = cv2.waitKey(1)
     if k == 27:
         break
+tuberia.detener()
+tuberia.resumen()  #FPS de cada hilo y latencia de punta a punta
 cap.release()
 cv2.destroyAllWindows()
@@ -0,0 +1,238 @@
+
+#------------------------------Importamos las librerias -----------------------------------
+import math
+import cv2
+import mediapipe as mp
+import numpy as np
+import time
+
+#-------------------------------- Creamos una clase---------------------------------
+class detectormanos():
+    #-------------------Inicializamos los parametros de la deteccion----------------
+    def __init__(self, mode=False, maxManos = 2, model_complexity=1, Confdeteccion = 0.5, Confsegui = 0.5, anchoInferencia = None):
+        self.mode = mode          #Creamos el objeto y el tendra su propia variable
+        self.maxManos = maxManos  #Lo mismo haremos con todos los objetos
+        self.compl = model_complexity
+        self.Confdeteccion = Confdeteccion
+        self.Confsegui = Confsegui
+        # Ancho en pixeles de la imagen que se le pasa a MediaPipe (None = el frame completo).
+        # Con 256-320 la inferencia y el cvtColor son mucho mas baratos; los puntos salen
+        # normalizados, asi que se dibujan y convierten sobre el frame completo igual que antes
+        self.anchoInferencia = anchoInferencia
+        self.reducida = None
+        self.imgcolor = None
+
+        # ---------------------------- Creamos los objetos que detectaran las manos y las dibujaran----------------------
+        self.mpmanos = mp.solutions.hands
+        self.manos = self.mpmanos.Hands(self.mode, self.maxManos, self.compl, self.Confdeteccion, self.Confsegui)
+        self.dibujo = mp.solutions.drawing_utils
+        self.tip = [4,8,12,16,20]
+        self.puntos = np.zeros((0, 21, 3), dtype=np.float32) #Puntos de todas las manos del ultimo frame
+        self.puntosmano = np.zeros((0, 2), dtype=np.int32)    #Puntos en pixeles de la mano de encontrarposicion
+
+    #----------------------------------------Funcion para encontrar las manos-----------------------------------
+    def encontrarmanos(self, frame, dibujar = True ):
+        self.resultados = self.manos.process(self.imageninferencia(frame))
+        self.puntos = self.extraerpuntos(frame)
+
+        if self.resultados.multi_hand_landmarks:
+            for mano in self.resultados.multi_hand_landmarks:
+                if dibujar:
+                    self.dibujo.draw_landmarks(frame, mano, self.mpmanos.HAND_CONNECTIONS)  # Dibujamos las conexiones de los puntos
+        return frame
+
+    #------------------------------Funcion para preparar la imagen que procesa MediaPipe--------------------------
+    def imageninferencia(self, frame):
+        # Copia RGB del frame, reducida a anchoInferencia si es mas ancho. Se reduce antes de
+        # convertir a RGB y las dos imagenes se reservan una vez y se reutilizan en cada frame
+        alto, ancho = frame.shape[:2]
+        if self.anchoInferencia is not None and ancho > self.anchoInferencia:
+            tam = (self.anchoInferencia, max(1, round(alto * self.anchoInferencia / ancho)))
+            if self.reducida is None or self.reducida.shape[:2] != (tam[1], tam[0]):
+                self.reducida = np.empty((tam[1], tam[0], 3), dtype=np.uint8)
+            cv2.resize(frame, tam, dst=self.reducida, interpolation=cv2.INTER_AREA)
+            frame = self.reducida
+        if self.imgcolor is None or self.imgcolor.shape != frame.shape:
+            self.imgcolor = np.empty(frame.shape, dtype=np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.imgcolor)
+        return self.imgcolor
+
+    #------------------------------Funcion para convertir los puntos en un arreglo------------------------------
+    def extraerpuntos(self, frame):
+        # Todas las manos en un arreglo (manos, 21, 3) float32: x, y en pixeles y la profundidad z
+        # en la misma escala que x (asi la entrega MediaPipe). Se escala de una sola vez en lugar
+        # de convertir cada punto y leer frame.shape en cada vuelta. Como MediaPipe entrega los
+        # puntos normalizados (0 a 1) quedan en pixeles del frame aunque se infiera en pequeño
+        if not self.resultados.multi_hand_landmarks:
+            return np.zeros((0, 21, 3), dtype=np.float32)
+        alto, ancho = frame.shape[:2]
+        puntos = np.array([[(lm.x, lm.y, lm.z) for lm in mano.landmark]
+                           for mano in self.resultados.multi_hand_landmarks], dtype=np.float32)
+        puntos *= np.array([ancho, alto, ancho], dtype=np.float32)
+        return puntos
+
+    #-----------------------------------Funcion para encontrar los cuadros de las manos-------------------------
+    def cajas(self, puntos = None):
+        # (manos, 4) con xmin, ymin, xmax, ymax de cada mano, con min/max sobre sus 21 puntos
+        puntos = self.puntos if puntos is None else puntos
+        return np.concatenate([puntos[:, :, :2].min(axis=1), puntos[:, :, :2].max(axis=1)], axis=1)
+
+    #-----------------------------Funcion para saber que dedos estan arriba en todas las manos-----------------
+    def dedosarribatodas(self, puntos = None):
+        # (manos, 5) con 1 si el dedo esta arriba. El pulgar compara x de la punta con la
+        # articulacion anterior; los demas, y de la punta con la de dos articulaciones abajo
+        puntos = self.puntos if puntos is None else puntos
+        puntas = np.array(self.tip)
+        dedos = np.empty((len(puntos), 5), dtype=np.uint8)
+        dedos[:, 0] = puntos[:, puntas[0], 0] > puntos[:, puntas[0] - 1, 0]
+        dedos[:, 1:] = puntos[:, puntas[1:], 1] < puntos[:, puntas[1:] - 2, 1]
+        return dedos
+
+    #-------------------------------Funcion para extraer todas las manos de una vez------------------------------
+    def encontrartodas(self, frame, dibujar = True, colores = ([0,255,0], [255,0,0])):
+        # Todas las manos del ultimo encontrarmanos en un solo resultadomanos, con su lateralidad,
+        # cuadros y dedos calculados juntos. Reemplaza llamar encontrarposicion una vez por mano
+        lateralidad, puntajes = [], []
+        if self.resultados.multi_hand_landmarks and self.resultados.multi_handedness:
+            for clasificacion in self.resultados.multi_handedness:
+                lateralidad.append(clasificacion.classification[0].label)
+                puntajes.append(clasificacion.classification[0].score)
+        resultado = resultadomanos(self.puntos, lateralidad, puntajes, self.cajas(), self.dedosarribatodas())
+        if dibujar:
+            resultado.dibujar(frame, colores)
+        return resultado
+
+    #------------------------------------Funcion para encontrar la posicion----------------------------------
+    def encontrarposicion(self, frame, ManoNum = 0, dibujar = True, color = []):
+        bbox = []
+        self.lista = []
+        self.puntosmano = np.zeros((0, 2), dtype=np.int32)
+        player = len(self.puntos)
+        if ManoNum < player:
+            self.puntosmano = self.puntos[ManoNum, :, :2].astype(np.int32)  # Convertimos la informacion en pixeles
+            self.lista = [[id, cx, cy] for id, (cx, cy) in enumerate(self.puntosmano.tolist())]
+            xmin, ymin = self.puntosmano.min(axis=0).tolist()
+            xmax, ymax = self.puntosmano.max(axis=0).tolist()
+            bbox = xmin, ymin, xmax, ymax
+            if dibujar:
+                for id, cx, cy in self.lista:
+                    cv2.circle(frame,(cx, cy), 3, (0, 0, 0), cv2.FILLED)  # Dibujamos un circulo
+                # Dibujamos cuadro
+                cv2.rectangle(frame,(xmin - 20, ymin - 20), (xmax + 20, ymax + 20), color,2)
+        return self.lista, bbox, player
+
+    #----------------------------------Funcion para detectar y dibujar los dedos arriba------------------------
+    def dedosarriba(self):
+        # Dedos de la mano de encontrarposicion
+        return self.dedosarribatodas(self.puntosmano[np.newaxis])[0].tolist()
+
+    #--------------------------- Funcion para detectar la distancia entre dedos----------------------------
+    def distancia(self, p1, p2, frame, dibujar = True, r = 15, t = 3):
+        x1, y1 = self.puntosmano[p1].tolist()
+        x2, y2 = self.puntosmano[p2].tolist()
+        cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+        if dibujar:
+            cv2.line(frame, (x1,y1), (x2,y2), (0,0,255),t)
+            cv2.circle(frame, (x1,y1), r, (0,0,255), cv2.FILLED)
+            cv2.circle(frame, (x2,y2), r, (0, 0, 255), cv2.FILLED)
+            cv2.circle(frame, (cx,cy), r, (0, 0, 255), cv2.FILLED)
+        length = math.hypot(x2-x1, y2-y1)
+
+        return length, frame, [x1, y1, x2, y2, cx, cy]
+
+#----------------------------------- Resultado con todas las manos de un frame ----------------------------------
+class resultadomanos():
+    # Lo que entrega detectormanos.encontrartodas. Todo esta indexado por mano:
+    #   puntos       (manos, 21, 3) float32 en pixeles
+    #   lateralidad  'Left' o 'Right' segun MediaPipe (vacia si no la entrego)
+    #   cajas        (manos, 4) xmin, ymin, xmax, ymax
+    #   dedos        (manos, 5) 1 si el dedo esta arriba, mismo criterio que dedosarriba
+    def __init__(self, puntos, lateralidad, puntajes, cajas, dedos):
+        self.puntos = puntos
+        self.lateralidad = lateralidad
+        self.puntajes = puntajes
+        self.cajas = cajas
+        self.dedos = dedos
+
+    def __len__(self):
+        return len(self.puntos)
+
+    @staticmethod
+    def vacio():
+        # Resultado sin manos (por ejemplo antes de la primera inferencia)
+        return resultadomanos(np.zeros((0, 21, 3), dtype=np.float32), [], [],
+                              np.zeros((0, 4), dtype=np.float32), np.zeros((0, 5), dtype=np.uint8))
+
+    def distancias(self, p1, p2):
+        # Distancia en pixeles entre los puntos p1 y p2 de todas las manos. Con listas de indices
+        # regresa (manos, len(p1)); por ejemplo distancias([4,8], [8,12]) mide pulgar-indice e
+        # indice-corazon de cada mano en una sola operacion
+        diferencia = self.puntos[:, p1, :2] - self.puntos[:, p2, :2]
+        return np.linalg.norm(diferencia, axis=-1)
+
+    def distancia(self, p1, p2, frame, ManoNum = 0, dibujar = True, r = 15, t = 3):
+        # Igual que detectormanos.distancia pero para la mano ManoNum de este resultado
+        x1, y1 = self.puntos[ManoNum, p1, :2].astype(np.int32).tolist()
+        x2, y2 = self.puntos[ManoNum, p2, :2].astype(np.int32).tolist()
+        cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+        if dibujar:
+            cv2.line(frame, (x1,y1), (x2,y2), (0,0,255),t)
+            cv2.circle(frame, (x1,y1), r, (0,0,255), cv2.FILLED)
+            cv2.circle(frame, (x2,y2), r, (0, 0, 255), cv2.FILLED)
+            cv2.circle(frame, (cx,cy), r, (0, 0, 255), cv2.FILLED)
+        length = math.hypot(x2-x1, y2-y1)
+
+        return length, frame, [x1, y1, x2, y2, cx, cy]
+
+    def lista(self, ManoNum = 0):
+        # La mano en el formato de encontrarposicion: [[id, cx, cy], ...]
+        pixeles = self.puntos[ManoNum, :, :2].astype(np.int32).tolist()
+        return [[id, cx, cy] for id, (cx, cy) in enumerate(pixeles)]
+
+    def dibujar(self, frame, colores = ([0,255,0], [255,0,0])):
+        # Cuadro de cada mano (colores[i] para la mano i) y sus puntos
+        for i, (xmin, ymin, xmax, ymax) in enumerate(self.cajas.astype(np.int32).tolist()):
+            for cx, cy in self.puntos[i, :, :2].astype(np.int32).tolist():
+                cv2.circle(frame, (cx, cy), 3, (0, 0, 0), cv2.FILLED)
+            cv2.rectangle(frame, (xmin - 20, ymin - 20), (xmax + 20, ymax + 20), colores[i % len(colores)], 2)
+        return frame
+
+#----------------------------------------------- Funcion principal-------------------- ----------------------------
+def main():
+    from tuberiaManos import tuberiamanos  # Aqui para no importarse en circulo
+
+    # -------------------------------------Leemos la camara web ---------------------------------------------
+    cap = cv2.VideoCapture(0)
+    #-------------------------------------Crearemos el objeto -------------------------------------
+    detector = detectormanos()
+    # ------------------ La camara y la deteccion corren en sus propios hilos ------------------------------
+    tuberia = tuberiamanos(cap, detector)
+    while True:
+        datos = tuberia.siguiente()
+        if datos is None:
+            break
+        #Siempre el frame mas nuevo con los puntos de la deteccion mas reciente
+        frame, manos = datos
+        tuberia.dibujar(frame)
+        manos.dibujar(frame, colores = [[0,0,0]])
+        # ------------------------------------Mostramos los fps y la latencia --------------------------------
+        e = tuberia.estadisticas()
+        cv2.putText(frame, str(int(e['fpsDibujo'])), (10, 70), cv2.FONT_HERSHEY_PLAIN, 3, (255, 0, 255), 3)
+        if e['latenciaMs'] is not None:
+            cv2.putText(frame, '{:.0f} ms'.format(e['latenciaMs']), (10, 110), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 255), 2)
+
+        cv2.imshow("Manos", frame)
+        k = cv2.waitKey(1)
+
+        if k == 27:
+            break
+    tuberia.detener()
+    tuberia.resumen()
+    cap.release()
+    cv2.destroyAllWindows()
+
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#------------------------------Importamos las librerias -----------------------------------
+import os
+import time
+import numpy as np
+import filtroPuntos as fp
+
+#---------------------------------Declaracion de variables---------------------------------------
+# Repite una traza grabada de los 21 puntos de la mano con cada filtro y mide, en el momento
+# en que el resultado se mostraria (tiempo de captura + latencia):
+#   Temblor px   error cuando la mano esta quieta (lo que se ve como cursor tembloroso)
+#   Error px     error cuando la mano se mueve (el retraso se ve como error)
+#   Retraso ms   corrimiento en el tiempo que mejor alinea la salida con la referencia
+# La referencia es la traza suavizada sin causalidad (promedia hacia atras y hacia adelante,
+# asi que no tiene retraso); no es la verdad absoluta pero sirve para comparar filtros.
+traza = 'traza.npz'       # tiempos (N,) y puntos (N, 21, 3) con NaN cuando no hay mano
+segundosGrabacion = 30    # Si no existe la traza se graba con la camara
+latencia = 0.06           # Segundos de la deteccion a la pantalla (tuberiamanos.resumen() la mide)
+sigmaReferencia = 2.0     # Muestras del suavizado gaussiano de la referencia
+velocidadQuieta = 60      # px/s por debajo de los cuales la mano se considera quieta
+sua = 5                   # Suavizado fijo que usaba MouseVirtual.py, para comparar
+
+filtros = [
+    ('Sin filtro', None, False),
+    ('Suavizado fijo sua={}'.format(sua), 'fijo', False),
+    ('Uno Euro', fp.filtrounoeuro(frecuenciaMin=1.0, beta=0.02), False),
+    ('Uno Euro + prediccion', fp.filtrounoeuro(frecuenciaMin=1.0, beta=0.02), True),
+    ('Uno Euro + pred. siempre', fp.filtrounoeuro(frecuenciaMin=1.0, beta=0.02, velocidadMinima=0), True),
+    ('Kalman', fp.filtrokalman(ruidoMedicion=4.0, ruidoAceleracion=2e5), False),
+    ('Kalman + prediccion', fp.filtrokalman(ruidoMedicion=4.0, ruidoAceleracion=2e5), True),
+    ('Kalman + pred. siempre', fp.filtrokalman(ruidoMedicion=4.0, ruidoAceleracion=2e5, velocidadMinima=0), True),
+]
+
+#----------------------------------- Funciones ----------------------------------------
+def grabartraza(ruta, segundos):
+    import cv2
+    import SeguimientoManos as sm  # Solo hace falta para grabar
+    cap = cv2.VideoCapture(0)
+    detector = sm.detectormanos(maxManos=1)
+    tiempos, puntos = [], []
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < segundos:
+        ret, frame = cap.read()
+        if ret == False:
+            break
+        tiempos.append(time.perf_counter() - inicio)
+        detector.encontrarmanos(frame)
+        puntos.append(detector.puntos[0] if len(detector.puntos) else np.full((21, 3), np.nan, dtype=np.float32))
+        cv2.imshow("Grabando traza", frame)
+        if cv2.waitKey(1) == 27:
+            break
+    cap.release()
+    cv2.destroyAllWindows()
+    np.savez(ruta, tiempos=np.array(tiempos), puntos=np.array(puntos, dtype=np.float32))
+    print('Traza guardada en', ruta, '({} muestras)'.format(len(tiempos)))
+
+def referencia(tiempos, puntos):
+    # Suavizado gaussiano centrado de cada tramo con mano; los bordes de cada tramo quedan NaN
+    nucleo = np.exp(-0.5 * (np.arange(-3 * int(sigmaReferencia), 3 * int(sigmaReferencia) + 1) / sigmaReferencia) ** 2)
+    nucleo /= nucleo.sum()
+    medio = len(nucleo) // 2
+    salida = np.full_like(puntos, np.nan)
+    valido = ~np.isnan(puntos[:, 0, 0])
+    cambios = np.flatnonzero(np.diff(np.concatenate([[0], valido.astype(np.int8), [0]])))
+    for a, b in zip(cambios[::2], cambios[1::2]):
+        if b - a <= 2 * medio:
+            continue
+        tramo = puntos[a:b].reshape(b - a, -1)
+        suave = np.apply_along_axis(lambda c: np.convolve(c, nucleo, mode='valid'), 0, tramo)
+        salida[a + medio:b - medio] = suave.reshape(-1, *puntos.shape[1:])
+    return salida
+
+def correr(filtro, predecir, tiempos, puntos):
+    # Salida de cada muestra tal como se veria 'latencia' segundos despues de capturarla
+    salida = np.full_like(puntos, np.nan)
+    previo = None
+    for i, (t, p) in enumerate(zip(tiempos, puntos)):
+        if np.isnan(p[0, 0]):
+            previo = None
+            if filtro not in (None, 'fijo'):
+                filtro.reiniciar()
+            continue
+        if filtro is None:
+            salida[i] = p
+        elif filtro == 'fijo':
+            previo = p if previo is None else previo + (p - previo) / sua
+            salida[i] = previo
+        else:
+            filtro.filtrar(p, t)
+            salida[i] = filtro.predecir(t + latencia) if predecir else filtro.x
+    return salida
+
+def mostrada(tiempos, valores, retraso):
+    # Valores de la referencia 'retraso' segundos despues de cada muestra (interpolados)
+    planos = valores.reshape(len(valores), -1)
+    return np.stack([np.interp(tiempos + retraso, tiempos, c, left=np.nan, right=np.nan) for c in planos.T], axis=1).reshape(valores.shape)
+
+def errores(salida, objetivo, mascara):
+    # Error promedio por punto (pixeles, solo x y) de las muestras de 'mascara'
+    distancia = np.linalg.norm(salida[..., :2] - objetivo[..., :2], axis=-1).mean(axis=1)
+    distancia = distancia[mascara & ~np.isnan(distancia)]
+    return float(np.sqrt(np.mean(distancia ** 2))) if len(distancia) else float('nan')
+
+#----------------------------------------------- Funcion principal-------------------- ----------------------------
+def main():
+    if not os.path.exists(traza):
+        print('No existe', traza, '- grabando', segundosGrabacion, 's con la camara (Esc para terminar)')
+        grabartraza(traza, segundosGrabacion)
+    datos = np.load(traza)
+    tiempos, puntos = datos['tiempos'], datos['puntos']
+    print('Muestras: {} ({:.1f} Hz), con mano: {:.0%}'.format(len(tiempos), (len(tiempos) - 1) / (tiempos[-1] - tiempos[0]),
+                                                            np.mean(~np.isnan(puntos[:, 0, 0]))))
+
+    suave = referencia(tiempos, puntos)
+    velocidad = np.full(len(tiempos), np.nan)
+    velocidad[1:] = np.linalg.norm(np.diff(suave[..., :2], axis=0), axis=-1).mean(axis=1) / np.diff(tiempos)
+    quieta = velocidad < velocidadQuieta
+    moviendo = velocidad >= velocidadQuieta
+    objetivo = mostrada(tiempos, suave, latencia)  # Donde esta la mano cuando se muestra el resultado
+    corrimientos = np.arange(-0.05, 0.2001, 0.005)
+    print('Muestras quieta: {}  en movimiento: {}  latencia: {:.0f} ms'.format(quieta.sum(), moviendo.sum(), latencia * 1000))
+
+    print('{:<28}{:>14}{:>12}{:>14}{:>12}'.format('Filtro', 'Temblor px', 'Error px', 'Retraso ms', 'us/muestra'))
+    for nombre, filtro, predecir in filtros:
+        inicio = time.perf_counter()
+        salida = correr(filtro, predecir, tiempos, puntos)
+        costo = (time.perf_counter() - inicio) / len(tiempos) * 1e6
+        # Retraso: cuanto hay que atrasar la referencia para que coincida mejor con lo que se ve
+        ajuste = [errores(salida, mostrada(tiempos, suave, latencia - c), moviendo) for c in corrimientos]
+        retraso = corrimientos[int(np.nanargmin(ajuste))] * 1000 if not np.all(np.isnan(ajuste)) else float('nan')
+        print('{:<28}{:>14.2f}{:>12.2f}{:>14.0f}{:>12.1f}'.format(nombre, errores(salida, objetivo, quieta),
+                                                                  errores(salida, objetivo, moviendo), retraso, costo))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#------------------------------Importamos las librerias -----------------------------------
+import math
+import numpy as np
+
+# Filtros para los 21 puntos de la mano (o cualquier arreglo de puntos, p. ej. (21, 3)): todos
+# los puntos y coordenadas se filtran juntos con operaciones de NumPy. Los tiempos van en
+# segundos (time.perf_counter) y los puntos en pixeles.
+#
+# filtrar(puntos, t) recibe una deteccion nueva capturada en el tiempo t. predecir(t) extrapola
+# con la velocidad estimada hasta el tiempo t: con la tuberia de tuberiaManos.py los puntos ya
+# vienen atrasados (la latencia de punta a punta), asi que predecir hasta "ahora" la compensa.
+# Pero la velocidad estimada de una mano quieta es puro temblor y extrapolarla lo multiplica,
+# por eso la prediccion de cada punto se desvanece por debajo de 'velocidadMinima' px/s:
+# nada en 'velocidadMinima' o menos, completa desde el doble.
+
+def factorprediccion(velocidad, velocidadMinima):
+    # Fraccion (0 a 1) de la prediccion que se aplica a cada punto segun su velocidad (..., d)
+    if not velocidadMinima:
+        return 1.0
+    rapidez = np.linalg.norm(velocidad, axis=-1, keepdims=True)
+    return np.clip(rapidez / velocidadMinima - 1, 0.0, 1.0)
+
+#------------------------------------------ Filtro Uno Euro ------------------------------------------
+class filtrounoeuro():
+    # Filtro de paso bajo cuya frecuencia de corte sube con la velocidad (Casiez et al., 2012):
+    # quieto corta en frecuenciaMin y quita el temblor; rapido corta en
+    # frecuenciaMin + beta * velocidad y casi no agrega retraso.
+    #   frecuenciaMin  Hz; mas bajo = menos temblor en reposo
+    #   beta           s/px; mas alto = menos retraso al moverse rapido
+    #   dCorte         Hz del filtro de la velocidad
+    #   velocidadMinima  px/s; por debajo predecir() no extrapola (0 = siempre)
+    def __init__(self, frecuenciaMin = 1.0, beta = 0.02, dCorte = 1.0, velocidadMinima = 150):
+        self.frecuenciaMin = frecuenciaMin
+        self.beta = beta
+        self.dCorte = dCorte
+        self.velocidadMinima = velocidadMinima
+        self.reiniciar()
+
+    def reiniciar(self):
+        # Llamar cuando se pierde la mano, asi al volver no se arrastra la posicion anterior
+        self.x = None
+        self.dx = None
+        self.t = None
+
+    @staticmethod
+    def alfa(corte, dt):
+        tau = 1.0 / (2 * math.pi * corte)
+        return 1.0 / (1.0 + tau / dt)
+
+    def filtrar(self, puntos, t):
+        puntos = np.asarray(puntos, dtype=np.float32)
+        if self.x is None:
+            self.x = puntos.copy()
+            self.dx = np.zeros_like(puntos)
+            self.t = t
+            return self.x
+        dt = max(t - self.t, 1e-3)
+        aD = self.alfa(self.dCorte, dt)
+        self.dx = aD * (puntos - self.x) / dt + (1 - aD) * self.dx
+        # La velocidad de cada punto (norma sobre sus coordenadas) decide su corte
+        velocidad = np.linalg.norm(self.dx, axis=-1, keepdims=True)
+        a = self.alfa(self.frecuenciaMin + self.beta * velocidad, dt)
+        self.x = a * puntos + (1 - a) * self.x
+        self.t = t
+        return self.x
+
+    def predecir(self, t, maximo = 0.1):
+        # Posicion extrapolada al tiempo t (a lo mas 'maximo' segundos adelante)
+        if self.x is None:
+            return None
+        factor = factorprediccion(self.dx, self.velocidadMinima)
+        return self.x + factor * self.dx * min(max(t - self.t, 0.0), maximo)
+
+#------------------------------------------ Filtro de Kalman ------------------------------------------
+class filtrokalman():
+    # Kalman de velocidad constante, independiente para cada coordenada de cada punto. El estado
+    # (posicion, velocidad) y su covarianza 2x2 se guardan como arreglos del tamaño de los puntos
+    #   ruidoMedicion     px^2; cuanto tiembla la deteccion de MediaPipe
+    #   ruidoAceleracion  (px/s^2)^2; cuanto puede cambiar la velocidad, mas alto = sigue mejor
+    #                     los cambios rapidos pero filtra menos
+    #   velocidadMinima   px/s; por debajo predecir() no extrapola (0 = siempre)
+    def __init__(self, ruidoMedicion = 4.0, ruidoAceleracion = 2e5, velocidadMinima = 150):
+        self.r = ruidoMedicion
+        self.q = ruidoAceleracion
+        self.velocidadMinima = velocidadMinima
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.x = None
+        self.v = None
+        self.t = None
+
+    def filtrar(self, puntos, t):
+        puntos = np.asarray(puntos, dtype=np.float32)
+        if self.x is None:
+            self.x = puntos.copy()
+            self.v = np.zeros_like(puntos)
+            # Sin informacion de la velocidad al inicio
+            self.p00 = np.full_like(puntos, self.r)
+            self.p01 = np.zeros_like(puntos)
+            self.p11 = np.full_like(puntos, 1e6)
+            self.t = t
+            return self.x
+        dt = max(t - self.t, 1e-3)
+        # Prediccion
+        self.x = self.x + self.v * dt
+        self.p00 = self.p00 + dt * (2 * self.p01 + dt * self.p11) + self.q * dt**4 / 4
+        self.p01 = self.p01 + dt * self.p11 + self.q * dt**3 / 2
+        self.p11 = self.p11 + self.q * dt**2
+        # Correccion con la medicion
+        s = self.p00 + self.r
+        k0, k1 = self.p00 / s, self.p01 / s
+        error = puntos - self.x
+        self.x = self.x + k0 * error
+        self.v = self.v + k1 * error
+        self.p11 = self.p11 - k1 * self.p01
+        self.p01 = (1 - k0) * self.p01
+        self.p00 = (1 - k0) * self.p00
+        self.t = t
+        return self.x
+
+    def predecir(self, t, maximo = 0.1):
+        if self.x is None:
+            return None
+        factor = factorprediccion(self.v, self.velocidadMinima)
+        return self.x + factor * self.v * min(max(t - self.t, 0.0), maximo)
@@ -2,6 +2,7 @@
 import cv2
 import random
 import SeguimientoManos as sm  # Clase manos
+import tuberiaManos as tm  # Camara y deteccion en sus propios hilos
 import os
 import imutils
 
@@ -40,11 +41,16 @@ cap = cv2.VideoCapture(0)
 
 # Declaramos el detector
 detector = sm.detectormanos(Confdeteccion=0.9)
+# La camara (con el espejo) y la deteccion corren en sus propios hilos
+tuberia = tm.tuberiamanos(cap, detector, preparar=lambda frame: cv2.flip(frame,1))
 
 # Empezamos
 while True:
-    # Lectura de la videocaptura
-    ret, frame = cap.read()
+    # Frame mas nuevo (ya en espejo) y las manos de la deteccion mas reciente
+    datos = tuberia.siguiente()
+    if datos is None:
+        break
+    frame, manos = datos
 
     # Leemos teclado
     t = cv2.waitKey(1)
@@ -54,13 +60,12 @@ while True:
     cx = int(an/2)
     cy = int(al/2)
 
-    # Espejo
-    frame = cv2.flip(frame,1)
-
-    # Encontramos las manos
-    frame = detector.encontrarmanos(frame, dibujar=True)
+    # Dibujamos las manos: mano 1 en verde, mano 2 en azul
+    tuberia.dibujar(frame)
+    manos.dibujar(frame, colores=([0,255,0], [255,0,0]))
+    jug = len(manos)
     # Posiciones mano 1
-    lista1, bbox1, jug = detector.encontrarposicion(frame, ManoNum=0, dibujar=True, color = [0,255,0])
+    lista1 = manos.lista(0) if jug != 0 else []
 
     # 1 Jugador
     if jug == 1:
@@ -511,8 +516,8 @@ while True:
 
     # 2 Jugadores
     elif jug == 2:
-        # Encontramos la segunda mano
-        lista2, bbox2, jug2 = detector.encontrarposicion(frame, ManoNum=1, dibujar=True, color = [255,0,0])
+        # La segunda mano ya viene en manos (puntos, cuadro y dedos de las dos)
+        lista2 = manos.lista(1)
 
         # Dividimos pantalla
         cv2.line(frame, (cx, 0), (cx, 240), (255, 0, 0), 2)
@@ -544,5 +549,7 @@ while True:
     cv2.imshow("JUEGO CON AI", frame)
     if t == 27:
         break
+tuberia.detener()
+tuberia.resumen()
 cap.release()
 cv2.destroyAllWindows()
@@ -0,0 +1,90 @@
+#------------------------------Importamos las librerias -----------------------------------
+import cv2
+import time
+import numpy as np
+import SeguimientoManos as sm  # Clase manos
+
+#---------------------------------Declaracion de variables---------------------------------------
+# FPS y error de los puntos de la mano a distintos anchos de inferencia (anchoInferencia de
+# detectormanos) sobre videos grabados. La referencia es el mismo video procesado con el frame
+# completo; el error es la distancia promedio en pixeles del frame entre los 21 puntos de cada
+# mano y los de la referencia, tambien como % de la diagonal del cuadro de la mano
+videos = ['manos.mp4']            # Graba unos clips con la camara y ponlos aqui
+anchoVideo = 640                  # Los frames se llevan a este ancho, como en los demas programas
+maxFrames = 300                   # Frames por video (se cargan a memoria para no medir la lectura)
+anchos = [480, 320, 256, 192]     # Anchos de inferencia a comparar contra el frame completo
+maxManos = 2
+
+#----------------------------------- Funciones ----------------------------------------
+def leervideo(ruta):
+    cap = cv2.VideoCapture(ruta)
+    frames = []
+    while len(frames) < maxFrames:
+        ret, frame = cap.read()
+        if ret == False:
+            break
+        alto, ancho = frame.shape[:2]
+        if ancho != anchoVideo:
+            frame = cv2.resize(frame, (anchoVideo, round(alto * anchoVideo / ancho)), interpolation=cv2.INTER_AREA)
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def correr(frames, anchoInferencia):
+    # Regresa (segundos, puntos de cada frame) con un detector nuevo para cada ancho
+    detector = sm.detectormanos(maxManos=maxManos, anchoInferencia=anchoInferencia)
+    detector.encontrarmanos(frames[0], dibujar=False)  # Calentamiento (la primera llamada inicializa el modelo)
+    puntos = []
+    inicio = time.perf_counter()
+    for frame in frames:
+        detector.encontrarmanos(frame, dibujar=False)
+        puntos.append(detector.puntos)
+    return time.perf_counter() - inicio, puntos
+
+def emparejar(referencia, puntos):
+    # Empareja cada mano de la referencia con la mano mas cercana (por su centro) y regresa
+    # los errores (pixeles, fraccion de la diagonal) de las que se encontraron
+    errores = []
+    if len(referencia) == 0 or len(puntos) == 0:
+        return errores
+    centros = np.linalg.norm(referencia[:, None, :, :2].mean(axis=2) - puntos[None, :, :, :2].mean(axis=2), axis=2)
+    libres = list(range(len(puntos)))
+    for i in np.argsort(centros.min(axis=1)):
+        if not libres:
+            break
+        j = libres[int(np.argmin(centros[i, libres]))]
+        libres.remove(j)
+        error = np.linalg.norm(referencia[i, :, :2] - puntos[j, :, :2], axis=1).mean()
+        diagonal = np.linalg.norm(referencia[i, :, :2].max(axis=0) - referencia[i, :, :2].min(axis=0))
+        errores.append((error, error / max(diagonal, 1)))
+    return errores
+
+#----------------------------------------------- Funcion principal-------------------- ----------------------------
+def main():
+    frames = []
+    for ruta in videos:
+        leidos = leervideo(ruta)
+        print('{}: {} frames'.format(ruta, len(leidos)))
+        frames.extend(leidos)
+    if not frames:
+        print('No se pudo leer ningun video de', videos)
+        return
+
+    tiempoReferencia, referencia = correr(frames, None)
+    manosReferencia = sum(len(r) for r in referencia)
+    print('Frame completo ({} px): {:.1f} FPS, {} manos'.format(frames[0].shape[1], len(frames) / tiempoReferencia, manosReferencia))
+
+    print('{:>8}{:>10}{:>12}{:>14}{:>14}{:>14}{:>16}'.format('Ancho', 'FPS', 'Aceleracion', 'Encontradas', 'Error px', 'p95 px', 'Error % mano'))
+    for ancho in anchos:
+        tiempo, puntos = correr(frames, ancho)
+        errores = [e for r, p in zip(referencia, puntos) for e in emparejar(r, p)]
+        pixeles = np.array([e[0] for e in errores])
+        relativos = np.array([e[1] for e in errores])
+        print('{:>8}{:>10.1f}{:>11.2f}x{:>14}{:>14}{:>14}{:>16}'.format(ancho, len(frames) / tiempo, tiempoReferencia / tiempo,
+            '{:.1%}'.format(len(errores) / manosReferencia) if manosReferencia else '-',
+            '{:.2f}'.format(pixeles.mean()) if len(errores) else '-',
+            '{:.2f}'.format(np.percentile(pixeles, 95)) if len(errores) else '-',
+            '{:.2%}'.format(relativos.mean()) if len(errores) else '-'))
+
+if __name__ == "__main__":
+    main()
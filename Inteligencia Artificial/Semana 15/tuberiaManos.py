@@ -0,0 +1,157 @@
+#------------------------------Importamos las librerias -----------------------------------
+import time
+import threading
+from collections import deque
+import numpy as np
+import SeguimientoManos as sm  # Clase manos
+
+#------------------------------------ Casilla de ultimo valor ------------------------------------
+class casilla():
+    # Guarda solo el ultimo valor: quien escribe nunca espera a quien lee y quien lee siempre
+    # recibe lo mas nuevo (los valores que nadie alcanzo a leer simplemente se reemplazan)
+    def __init__(self):
+        self.condicion = threading.Condition()
+        self.valor = None
+        self.version = 0
+        self.cerrada = False
+
+    def poner(self, valor):
+        with self.condicion:
+            self.valor = valor
+            self.version += 1
+            self.condicion.notify_all()
+
+    def cerrar(self):
+        with self.condicion:
+            self.cerrada = True
+            self.condicion.notify_all()
+
+    def esperar(self, version, timeout = None):
+        # Espera un valor mas nuevo que 'version' y regresa (version, valor). Si se cerro o se
+        # acabo el tiempo regresa lo que haya, el que llama compara la version para saberlo
+        with self.condicion:
+            self.condicion.wait_for(lambda: self.version > version or self.cerrada, timeout)
+            return self.version, self.valor
+
+    def ultimo(self):
+        with self.condicion:
+            return self.version, self.valor
+
+#------------------------------- Captura, inferencia y dibujo en paralelo -------------------------------
+class tuberiamanos():
+    # La camara y MediaPipe corren cada uno en su propio hilo, conectados por casillas de ultimo
+    # valor; el ciclo del programa (dibujar, imshow, mover el mouse) solo llama siguiente().
+    # Asi la ventana va al ritmo de la camara aunque la inferencia sea mas lenta: siempre se
+    # muestra el frame mas nuevo con los puntos de la inferencia mas reciente.
+    #
+    # La latencia de punta a punta es el tiempo desde que se capturo el frame de los puntos
+    # hasta que siguiente() los entrega; estadisticas() la reporta junto con los FPS de cada hilo
+    def __init__(self, cap, detector, preparar = None, muestras = 300):
+        self.cap = cap
+        self.detector = detector
+        self.preparar = preparar  # Funcion opcional para cada frame antes de todo (p. ej. cv2.flip)
+        self.frames = casilla()   # (frame, numero, tiempo de captura)
+        self.manos = casilla()    # (resultadomanos, resultados de MediaPipe, numero, tiempo de captura)
+        self.activa = True
+        self.versionFrame = 0
+        self.resultados = None
+        self.versionManos = 0
+        self.nuevas = False       # True si siguiente() entrego una inferencia que no habia entregado
+        self.tiempoManos = None   # Tiempo de captura (time.perf_counter) del frame de esas manos
+        self.latencias = deque(maxlen=muestras)
+        self.atrasos = deque(maxlen=muestras)
+        self.cuenta = {'captura': 0, 'inferencia': 0, 'dibujo': 0}
+        self.inicio = time.perf_counter()
+        self.hilos = [threading.Thread(target=self._capturar, daemon=True),
+                      threading.Thread(target=self._inferir, daemon=True)]
+        for hilo in self.hilos:
+            hilo.start()
+
+    #--------------------------------------- Hilo de la camara ---------------------------------------
+    def _capturar(self):
+        numero = 0
+        while self.activa:
+            ret, frame = self.cap.read()
+            if ret == False:
+                break
+            tiempo = time.perf_counter()
+            if self.preparar is not None:
+                frame = self.preparar(frame)
+            numero += 1
+            self.cuenta['captura'] += 1
+            self.frames.poner((frame, numero, tiempo))
+        self.activa = False
+        self.frames.cerrar()
+
+    #----------------------------------------- Hilo de MediaPipe -----------------------------------------
+    def _inferir(self):
+        version = 0
+        while True:
+            nueva, dato = self.frames.esperar(version)
+            if nueva == version:  # Se cerro sin frames nuevos
+                break
+            version = nueva
+            frame, numero, tiempo = dato
+            # El detector solo se usa en este hilo; el frame no se modifica aqui ni en siguiente()
+            self.detector.encontrarmanos(frame, dibujar = False)
+            manos = self.detector.encontrartodas(frame, dibujar = False)
+            self.cuenta['inferencia'] += 1
+            self.manos.poner((manos, self.detector.resultados, numero, tiempo))
+        self.manos.cerrar()
+
+    #------------------------------------------ Ciclo del programa ------------------------------------------
+    def siguiente(self, timeout = 1.0):
+        # Espera el siguiente frame de la camara y regresa (frame, manos): una copia del frame
+        # para dibujar encima y el resultadomanos mas reciente (puede venir de un frame anterior).
+        # Regresa None cuando la camara o el video se terminan
+        while True:
+            version, dato = self.frames.esperar(self.versionFrame, timeout)
+            if version != self.versionFrame:
+                break
+            if not self.activa:
+                return None
+        self.versionFrame = version
+        frame, numero, tiempo = dato
+
+        versionManos, inferencia = self.manos.ultimo()
+        self.nuevas = versionManos != self.versionManos
+        self.versionManos = versionManos
+        if inferencia is None:
+            manos, self.resultados, self.tiempoManos = sm.resultadomanos.vacio(), None, None
+        else:
+            manos, self.resultados, numeroManos, self.tiempoManos = inferencia
+            self.latencias.append(time.perf_counter() - self.tiempoManos)
+            self.atrasos.append(numero - numeroManos)
+        self.cuenta['dibujo'] += 1
+        return frame.copy(), manos
+
+    def dibujar(self, frame):
+        # Conexiones de MediaPipe de la inferencia que entrego el ultimo siguiente()
+        if self.resultados is not None and self.resultados.multi_hand_landmarks:
+            for mano in self.resultados.multi_hand_landmarks:
+                self.detector.dibujo.draw_landmarks(frame, mano, self.detector.mpmanos.HAND_CONNECTIONS)
+        return frame
+
+    def estadisticas(self):
+        tiempo = max(time.perf_counter() - self.inicio, 1e-9)
+        latencias = np.array(self.latencias) * 1000
+        return {
+            'fpsCaptura': self.cuenta['captura'] / tiempo,
+            'fpsInferencia': self.cuenta['inferencia'] / tiempo,
+            'fpsDibujo': self.cuenta['dibujo'] / tiempo,
+            'latenciaMs': float(latencias.mean()) if len(latencias) else None,
+            'latenciaP95Ms': float(np.percentile(latencias, 95)) if len(latencias) else None,
+            'framesAtraso': float(np.mean(self.atrasos)) if len(self.atrasos) else None,  # Frames entre el mostrado y el de los puntos
+        }
+
+    def detener(self):
+        self.activa = False
+        for hilo in self.hilos:
+            hilo.join(timeout = 2)
+
+    def resumen(self):
+        e = self.estadisticas()
+        print('FPS captura {:.1f}, inferencia {:.1f}, dibujo {:.1f}'.format(e['fpsCaptura'], e['fpsInferencia'], e['fpsDibujo']))
+        if e['latenciaMs'] is not None:
+            print('Latencia de punta a punta: {:.1f} ms (p95 {:.1f} ms), puntos {:.1f} frames atras'.format(
+                e['latenciaMs'], e['latenciaP95Ms'], e['framesAtraso']))
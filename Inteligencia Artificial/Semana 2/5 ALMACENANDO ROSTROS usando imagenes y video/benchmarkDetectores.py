@@ -0,0 +1,122 @@
+import cv2
+import os
+import json
+import time
+import numpy as np
+from detectorRostros import crearDetector
+
+# Latencia (CPU) y recall de cada detector sobre una carpeta de imágenes, para elegir el
+# más rápido que cumpla con el recall que necesita cada despliegue.
+#
+# Las cajas reales se leen de 'anotaciones' ({"imagen_000.jpg": [[x, y, w, h], ...], ...}).
+# Si no existe ese archivo se usan como referencia las cajas del detector 'referencia'
+# (entonces el recall es "cuánto de lo que encuentra la referencia encuentra cada uno").
+imagesPath = 'Imagenes' # Cambia a la ruta donde hayas almacenado la carpeta con las imágenes
+anotaciones = 'anotaciones.json'
+referencia = ('YUNET', {'anchoEntrada': None})
+recallObjetivo = 0.9
+iouMinimo = 0.5
+repeticiones = 3
+hilos = 1 # cv2.setNumThreads; None deja los que OpenCV elija
+
+detectores = [
+	('HAAR', {'scaleFactor': 1.3, 'minNeighbors': 5}),
+	('HAAR', {'scaleFactor': 1.1, 'minNeighbors': 5}),
+	('HAAR', {'scaleFactor': 1.1, 'minNeighbors': 5, 'anchoEntrada': 320}),
+	('SSD', {'anchoEntrada': 300}),
+	('SSD', {'anchoEntrada': 200}),
+	('YUNET', {'anchoEntrada': 640}),
+	('YUNET', {'anchoEntrada': 320}),
+	('YUNET', {'anchoEntrada': 160}),
+]
+
+def iou(a, b):
+	# IoU de todas las cajas de 'a' (N, 4) contra todas las de 'b' (M, 4) -> (N, M)
+	a = np.asarray(a, dtype=np.float32).reshape(-1, 4)[:, None]
+	b = np.asarray(b, dtype=np.float32).reshape(-1, 4)[None]
+	ancho = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+	alto = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+	interseccion = np.clip(ancho, 0, None) * np.clip(alto, 0, None)
+	return interseccion / (a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - interseccion)
+
+def aciertos(reales, detectadas):
+	# Emparejamiento voraz: cada caja real cuenta a lo más una detección con IoU >= iouMinimo
+	if len(reales) == 0 or len(detectadas) == 0:
+		return 0
+	matriz = iou(reales, detectadas)
+	total = 0
+	while matriz.size and matriz.max() >= iouMinimo:
+		i, j = np.unravel_index(matriz.argmax(), matriz.shape)
+		matriz[i, :] = -1
+		matriz[:, j] = -1
+		total = total + 1
+	return total
+
+def nombreDetector(nombre, opciones):
+	return nombre + ' ' + ' '.join('{}={}'.format(k, v) for k, v in opciones.items())
+
+def main():
+	if hilos is not None:
+		cv2.setNumThreads(hilos)
+	nombres = sorted(os.listdir(imagesPath)) if os.path.isdir(imagesPath) else []
+	imagenes = [cv2.imread(imagesPath + '/' + nombre) for nombre in nombres]
+	nombres = [n for n, imagen in zip(nombres, imagenes) if imagen is not None]
+	imagenes = [imagen for imagen in imagenes if imagen is not None]
+	if not imagenes:
+		print('No hay imágenes en', os.path.abspath(imagesPath), '(cambia imagesPath a tu carpeta de imágenes)')
+		return
+	print('Imágenes:', len(imagenes))
+
+	if os.path.exists(anotaciones):
+		with open(anotaciones) as archivo:
+			cajas = json.load(archivo)
+		reales = [np.asarray(cajas.get(nombre, []), dtype=np.int32).reshape(-1, 4) for nombre in nombres]
+		print('Cajas reales de', anotaciones)
+	else:
+		try:
+			detector = crearDetector(referencia[0], **referencia[1])
+			reales = [detector.detectar(imagen) for imagen in imagenes]
+			print('Sin', anotaciones, '- referencia:', nombreDetector(*referencia))
+		except FileNotFoundError as e:
+			reales = None
+			print('Sin', anotaciones, 'ni referencia ({}), solo se mide la latencia'.format(e))
+
+	resultados = []
+	print('{:<56}{:>10}{:>10}{:>10}{:>12}'.format('Detector', 'ms/img', 'p95 ms', 'Recall', 'Precision'))
+	for nombre, opciones in detectores:
+		try:
+			detector = crearDetector(nombre, **opciones)
+		except FileNotFoundError as e:
+			print('{:<56}{}'.format(nombreDetector(nombre, opciones), e))
+			continue
+		detector.detectar(imagenes[0]) # Calentamiento (la primera llamada reserva memoria)
+		tiempos = []
+		for _ in range(repeticiones):
+			for imagen in imagenes:
+				inicio = time.perf_counter()
+				detector.detectar(imagen)
+				tiempos.append((time.perf_counter() - inicio) * 1000)
+		detecciones = [detector.detectar(imagen) for imagen in imagenes]
+
+		recall = precision = None
+		if reales is not None:
+			encontradas = sum(aciertos(r, d) for r, d in zip(reales, detecciones))
+			totalReales = sum(len(r) for r in reales)
+			totalDetecciones = sum(len(d) for d in detecciones)
+			recall = encontradas / totalReales if totalReales else 1.0
+			precision = encontradas / totalDetecciones if totalDetecciones else 1.0
+		resultados.append((nombreDetector(nombre, opciones), np.mean(tiempos), recall))
+		print('{:<56}{:>10.2f}{:>10.2f}{:>10}{:>12}'.format(nombreDetector(nombre, opciones),
+			np.mean(tiempos), np.percentile(tiempos, 95),
+			'-' if recall is None else '{:.1%}'.format(recall),
+			'-' if precision is None else '{:.1%}'.format(precision)))
+
+	candidatos = [r for r in resultados if r[2] is not None and r[2] >= recallObjetivo]
+	if candidatos:
+		mejor = min(candidatos, key=lambda r: r[1])
+		print('Más rápido con recall >= {:.0%}: {} ({:.2f} ms/img)'.format(recallObjetivo, mejor[0], mejor[1]))
+	elif reales is not None:
+		print('Ningún detector alcanza recall >= {:.0%}'.format(recallObjetivo))
+
+if __name__ == '__main__':
+	main()
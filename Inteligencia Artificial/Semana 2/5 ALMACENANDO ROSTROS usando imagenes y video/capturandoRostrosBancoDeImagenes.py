@@ -1,5 +1,6 @@
 import cv2
 import os
+from detectorRostros import crearDetector
 
 imagesPath = "/Imagenes" # Cambia a la ruta donde hayas almacenado la carpeta con las imágenes
 imagesPathList = os.listdir(imagesPath)
@@ -8,15 +9,17 @@ if not os.path.exists('Rostros encontrados'):
 	print('Carpeta creada: Rostros encontrados')
 	os.makedirs('Rostros encontrados')
 
-faceClassif = cv2.CascadeClassifier(cv2.data.haarcascades+'haarcascade_frontalface_default.xml')
+# Detector de rostros (ver detectorRostros.py y benchmarkDetectores.py para elegirlo)
+faceClassif = crearDetector('HAAR', scaleFactor=1.1, minNeighbors=5)
+#faceClassif = crearDetector('SSD', anchoEntrada=300)
+#faceClassif = crearDetector('YUNET', anchoEntrada=320)
 
 count = 0
 for imageName in imagesPathList:
 	image = cv2.imread(imagesPath+'/'+imageName)
 	imageAux = image.copy()
-	gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 	
-	faces = faceClassif.detectMultiScale(gray, 1.1, 5)
+	faces = faceClassif.detectar(image)
 
 	for (x,y,w,h) in faces:
 		cv2.rectangle(image, (x,y),(x+w,y+h),(128,0,255),2)
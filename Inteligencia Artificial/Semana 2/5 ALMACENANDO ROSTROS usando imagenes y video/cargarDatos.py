@@ -0,0 +1,59 @@
+import cv2
+import os
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+def listarImagenes(dataPath):
+	# Recorre dataPath/<persona>/<imagen> y regresa las rutas, la etiqueta de cada
+	# imagen y la lista de nombres (la etiqueta es el índice del nombre en esa lista)
+	rutas = []
+	labels = []
+	nombres = []
+	for label, nameDir in enumerate(os.listdir(dataPath)):
+		personPath = dataPath + '/' + nameDir
+		nombres.append(nameDir)
+		with os.scandir(personPath) as archivos:
+			for archivo in archivos:
+				if archivo.is_file():
+					rutas.append(archivo.path)
+					labels.append(label)
+	return rutas, np.array(labels, dtype=np.int32), nombres
+
+def leerImagenes(rutas, tam=(150,150), hilos=None):
+	# Decodifica las imágenes en un grupo de hilos (cv2 libera el GIL al leer JPEG)
+	# y las escribe directo en un arreglo contiguo uint8 de forma (N, alto, ancho).
+	# Regresa (facesData, validos) donde validos marca las imágenes que sí se pudieron leer
+	facesData = np.empty((len(rutas), tam[1], tam[0]), dtype=np.uint8)
+	validos = np.ones(len(rutas), dtype=bool)
+
+	def leer(i):
+		imagen = cv2.imread(rutas[i], 0)
+		if imagen is None:
+			validos[i] = False
+			return
+		if imagen.shape != facesData.shape[1:]:
+			imagen = cv2.resize(imagen, tam, interpolation=cv2.INTER_CUBIC)
+		facesData[i] = imagen
+
+	with ThreadPoolExecutor(max_workers=hilos or os.cpu_count()) as pool:
+		for _ in pool.map(leer, range(len(rutas))):
+			pass
+	return facesData, validos
+
+def cargarRostros(dataPath, tam=(150,150), hilos=None):
+	# Lee todo dataPath/<persona>/<imagen> a un solo arreglo (N, alto, ancho) uint8.
+	# Regresa (facesData, labels, nombres)
+	inicio = time.time()
+	rutas, labels, nombres = listarImagenes(dataPath)
+	facesData, validos = leerImagenes(rutas, tam, hilos)
+
+	# Solo copiamos si hubo archivos que no se pudieron leer
+	if not validos.all():
+		print('Imágenes no válidas omitidas: ', int((~validos).sum()))
+		facesData, labels = facesData[validos], labels[validos]
+
+	tiempo = time.time() - inicio
+	print('Rostros leídos: {} de {} personas en {:.2f} s ({:.0f} imágenes/s)'.format(
+		len(facesData), len(nombres), tiempo, len(facesData) / tiempo if tiempo > 0 else 0))
+	return facesData, labels, nombres
@@ -0,0 +1,130 @@
+import cv2
+import os
+import numpy as np
+from abc import ABC, abstractmethod
+
+# Detectores de rostros intercambiables. Todos exponen detectar(imagen) que recibe un frame
+# BGR o en gris y regresa un arreglo (N, 4) de cajas (x, y, w, h) en pixeles del frame
+# original, así se pueden usar en lugar de faceClassif.detectMultiScale(...).
+#
+# 'anchoEntrada' es el ancho al que se reduce la imagen antes de detectar (conservando la
+# proporción). None usa la imagen completa. Menos pixeles = más rápido, pero se pierden
+# rostros pequeños; usa benchmarkDetectores.py para elegirlo con tus propias imágenes.
+#
+# Modelos de cv2.dnn (se descargan aparte y se dejan junto al script):
+#   SSD:   deploy.prototxt (opencv/samples/dnn/face_detector) y
+#          res10_300x300_ssd_iter_140000.caffemodel (opencv_3rdparty, dnn_samples_face_detector_20170830)
+#   YuNet: face_detection_yunet_2023mar.onnx (opencv_zoo, models/face_detection_yunet)
+
+class Detector(ABC):
+	# Las subclases solo implementan _detectar; detectar() se encarga de la escala y los bordes
+	def __init__(self, anchoEntrada=None):
+		self.anchoEntrada = anchoEntrada
+		self.puntajes = np.zeros(0, dtype=np.float32)
+
+	def detectar(self, imagen):
+		alto, ancho = imagen.shape[:2]
+		escala = 1.0
+		if self.anchoEntrada and ancho > self.anchoEntrada:
+			escala = self.anchoEntrada / ancho
+			imagen = cv2.resize(imagen, (self.anchoEntrada, max(1, int(round(alto * escala)))), interpolation=cv2.INTER_AREA)
+		cajas, self.puntajes = self._detectar(imagen)
+		if len(cajas) == 0:
+			return np.zeros((0, 4), dtype=np.int32)
+		# Regresamos las cajas a la escala del frame original y las recortamos a sus bordes
+		cajas = np.asarray(cajas, dtype=np.float32) / escala
+		x1 = np.clip(cajas[:, 0], 0, ancho)
+		y1 = np.clip(cajas[:, 1], 0, alto)
+		x2 = np.clip(cajas[:, 0] + cajas[:, 2], 0, ancho)
+		y2 = np.clip(cajas[:, 1] + cajas[:, 3], 0, alto)
+		cajas = np.stack([x1, y1, x2 - x1, y2 - y1], axis=1).round().astype(np.int32)
+		validas = (cajas[:, 2] > 0) & (cajas[:, 3] > 0)
+		self.puntajes = self.puntajes[validas]
+		return cajas[validas]
+
+	@abstractmethod
+	def _detectar(self, imagen):
+		# Regresa (cajas (N, 4) en pixeles de 'imagen', puntajes (N,))
+		pass
+
+def _requerir(*archivos):
+	for archivo in archivos:
+		if not os.path.exists(archivo):
+			raise FileNotFoundError('No existe el modelo ' + archivo + ' (ver detectorRostros.py)')
+
+class DetectorHaar(Detector):
+	# El clasificador en cascada que se usaba en todos los scripts. minSize=None deja el mínimo
+	# de detectMultiScale (sin límite), igual que las llamadas originales
+	def __init__(self, archivo=cv2.data.haarcascades+'haarcascade_frontalface_default.xml',
+				scaleFactor=1.3, minNeighbors=5, minSize=None, anchoEntrada=None):
+		Detector.__init__(self, anchoEntrada)
+		_requerir(archivo)
+		self.clasificador = cv2.CascadeClassifier(archivo)
+		if self.clasificador.empty():
+			raise ValueError('No se pudo leer el clasificador ' + archivo)
+		self.scaleFactor = scaleFactor
+		self.minNeighbors = minNeighbors
+		self.minSize = minSize
+
+	def _detectar(self, imagen):
+		if imagen.ndim == 3:
+			imagen = cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY)
+		if self.minSize is None:
+			cajas = self.clasificador.detectMultiScale(imagen, self.scaleFactor, self.minNeighbors)
+		else:
+			cajas = self.clasificador.detectMultiScale(imagen, self.scaleFactor, self.minNeighbors, minSize=self.minSize)
+		return cajas, np.ones(len(cajas), dtype=np.float32)
+
+class DetectorSSD(Detector):
+	# Res10 SSD de cv2.dnn, entrenado con entradas de 300x300
+	def __init__(self, config='deploy.prototxt', modelo='res10_300x300_ssd_iter_140000.caffemodel',
+				confianza=0.5, anchoEntrada=300):
+		Detector.__init__(self, anchoEntrada)
+		_requerir(config, modelo)
+		self.red = cv2.dnn.readNet(modelo, config)
+		self.confianza = confianza
+
+	def _detectar(self, imagen):
+		if imagen.ndim == 2:
+			imagen = cv2.cvtColor(imagen, cv2.COLOR_GRAY2BGR)
+		alto, ancho = imagen.shape[:2]
+		self.red.setInput(cv2.dnn.blobFromImage(imagen, 1.0, (ancho, alto), (104.0, 177.0, 123.0)))
+		salida = self.red.forward().reshape(-1, 7)
+		salida = salida[salida[:, 2] >= self.confianza]
+		# Las esquinas vienen normalizadas a [0, 1]
+		esquinas = salida[:, 3:7] * np.array([ancho, alto, ancho, alto], dtype=np.float32)
+		cajas = np.concatenate([esquinas[:, :2], esquinas[:, 2:] - esquinas[:, :2]], axis=1)
+		return cajas, salida[:, 2]
+
+class DetectorYuNet(Detector):
+	# YuNet (cv2.FaceDetectorYN): red pequeña pensada para CPU
+	def __init__(self, modelo='face_detection_yunet_2023mar.onnx', confianza=0.6, nms=0.3, anchoEntrada=320):
+		Detector.__init__(self, anchoEntrada)
+		_requerir(modelo)
+		self.red = cv2.FaceDetectorYN.create(modelo, '', (320, 320), confianza, nms)
+		self.tam = (320, 320)
+
+	def _detectar(self, imagen):
+		if imagen.ndim == 2:
+			imagen = cv2.cvtColor(imagen, cv2.COLOR_GRAY2BGR)
+		tam = (imagen.shape[1], imagen.shape[0])
+		if tam != self.tam:
+			self.red.setInputSize(tam)
+			self.tam = tam
+		_, caras = self.red.detect(imagen)
+		if caras is None:
+			return np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32)
+		return caras[:, :4], caras[:, -1]
+
+DETECTORES = {
+	'HAAR': DetectorHaar,
+	'SSD': DetectorSSD,
+	'YUNET': DetectorYuNet,
+}
+
+def crearDetector(nombre, **opciones):
+	# crearDetector('YUNET', anchoEntrada=320) -> detector con el método detectar(imagen)
+	nombre = nombre.upper()
+	if nombre not in DETECTORES:
+		raise ValueError('Detector desconocido: ' + nombre + ' (opciones: ' + ', '.join(DETECTORES) + ')')
+	return DETECTORES[nombre](**opciones)
@@ -0,0 +1,152 @@
+import cv2
+import os
+import json
+import time
+import numpy as np
+from multiprocessing import Pool
+from detectorRostros import crearDetector
+from datosEmpaquetados import DatosRostros
+from hashRostros import hashPerceptual, Deduplicador
+
+# Versión sin ventanas de capturandoRostrosBancoDeImagenes.py para bancos con cientos de
+# miles de fotos: detecta en un grupo de procesos, descarta rostros casi idénticos con un
+# hash perceptual y guarda un punto de control para continuar donde se quedó si se detiene.
+imagesPath = 'Imagenes' # Cambia a la ruta donde hayas almacenado la carpeta con las imágenes (se recorren subcarpetas)
+formato = 'empaquetado' # 'empaquetado' agrega los rostros a archivoDatos, 'archivos' guarda un .jpg por rostro
+archivoDatos = 'rostros.dat'
+nombre = 'Banco' # Nombre con el que se agregan los rostros al archivo empaquetado
+carpetaRostros = 'Rostros encontrados'
+puntoControl = 'extraccion.json' # Junto a él se guardan los hashes en extraccion.npy
+cadaSegundos = 10 # Cada cuánto se escriben los rostros pendientes y el punto de control
+
+# Detector (ver detectorRostros.py); las fotos grandes se reducen a anchoEntrada para detectar
+detector = ('HAAR', {'scaleFactor': 1.1, 'minNeighbors': 5, 'anchoEntrada': 640})
+#detector = ('YUNET', {'anchoEntrada': 640})
+procesos = os.cpu_count()
+lote = 32 # Imágenes por tarea que se manda a cada proceso
+distanciaHash = 6 # Bits distintos (de 64) a partir de los cuales dos rostros se consideran diferentes
+tam = (150,150)
+extensiones = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+# ---------------------------- Lo que corre en cada proceso ----------------------------
+
+def iniciarProceso(nombreDetector, opciones, color):
+	# Si el inicializador falla el Pool reemplaza al proceso y vuelve a fallar sin fin, así que
+	# el error se guarda y se lanza en procesarLote, de donde imap lo lleva al proceso principal
+	global detectorProceso, errorProceso, enColor
+	cv2.setNumThreads(1) # Un hilo por proceso, el paralelismo lo da el Pool
+	detectorProceso, errorProceso = None, None
+	try:
+		detectorProceso = crearDetector(nombreDetector, **opciones)
+	except Exception as e:
+		errorProceso = e
+	enColor = color
+
+def procesarLote(rutas):
+	# Regresa (rostros, hashes) de todas las caras encontradas en un lote de imágenes
+	if errorProceso is not None:
+		raise errorProceso
+	rostros, hashes = [], []
+	for ruta in rutas:
+		imagen = cv2.imread(ruta)
+		if imagen is None:
+			continue
+		for (x,y,w,h) in detectorProceso.detectar(imagen):
+			rostro = cv2.resize(imagen[y:y+h,x:x+w], tam, interpolation=cv2.INTER_CUBIC)
+			gris = cv2.cvtColor(rostro, cv2.COLOR_BGR2GRAY)
+			rostros.append(rostro if enColor else gris)
+			hashes.append(hashPerceptual(gris))
+	return rostros, hashes
+
+# ---------------------------------- Proceso principal ---------------------------------
+
+def listarImagenes(carpeta):
+	# Orden fijo para que el punto de control ('siguiente') apunte siempre a la misma imagen
+	rutas = []
+	for raiz, carpetas, archivos in os.walk(carpeta):
+		carpetas.sort()
+		rutas.extend(os.path.join(raiz, a) for a in sorted(archivos) if a.lower().endswith(extensiones))
+	return rutas
+
+def guardarPuntoControl(estado, hashes):
+	# Se escribe a un temporal y se renombra, así un corte no deja el archivo a medias
+	rutaHashes = os.path.splitext(puntoControl)[0] + '.npy'
+	with open(rutaHashes + '.tmp', 'wb') as f:
+		np.save(f, np.array(hashes, dtype=np.uint64))
+	os.replace(rutaHashes + '.tmp', rutaHashes)
+	with open(puntoControl + '.tmp', 'w') as f:
+		json.dump(estado, f)
+	os.replace(puntoControl + '.tmp', puntoControl)
+
+def cargarPuntoControl():
+	if not os.path.exists(puntoControl):
+		return {'imagenes': 0, 'siguiente': 0, 'rostros': 0, 'duplicados': 0}, ()
+	with open(puntoControl) as f:
+		estado = json.load(f)
+	return estado, np.load(os.path.splitext(puntoControl)[0] + '.npy')
+
+def main():
+	# El detector se prueba aquí antes de crear los procesos: un modelo que falta o no se puede
+	# leer se reporta una vez en lugar de en cada proceso
+	try:
+		crearDetector(detector[0], **detector[1])
+	except (OSError, ValueError, SystemError, cv2.error) as e:
+		print('No se pudo crear el detector {}: {}'.format(detector[0], e))
+		return
+	rutas = listarImagenes(imagesPath)
+	estado, hashes = cargarPuntoControl()
+	if estado['siguiente'] > 0:
+		print('Continuando desde la imagen {} de {}'.format(estado['siguiente'], len(rutas)))
+		if estado['imagenes'] != len(rutas):
+			print('Aviso: la carpeta tenía {} imágenes en el punto de control'.format(estado['imagenes']))
+	estado['imagenes'] = len(rutas)
+	deduplicador = Deduplicador(distanciaHash, hashes)
+
+	if formato == 'empaquetado':
+		datos = DatosRostros(archivoDatos, tam)
+	elif not os.path.exists(carpetaRostros):
+		print('Carpeta creada:', carpetaRostros)
+		os.makedirs(carpetaRostros)
+
+	pendientes = []
+	def guardar():
+		# Los rostros empaquetados se agregan juntos antes de cada punto de control; los .jpg se
+		# numeran desde el punto de control, así si se corta se reescriben en lugar de repetirse
+		if formato == 'empaquetado' and pendientes:
+			datos.agregar(np.stack(pendientes), nombre)
+		pendientes.clear()
+		guardarPuntoControl(estado, deduplicador.hashes)
+
+	porProcesar = rutas[estado['siguiente']:]
+	lotes = [porProcesar[i:i + lote] for i in range(0, len(porProcesar), lote)]
+	inicio = ultimoGuardado = time.time()
+	procesadas = 0
+	with Pool(procesos, initializer=iniciarProceso, initargs=(detector[0], detector[1], formato == 'archivos')) as pool:
+		try:
+			for rutasLote, (rostros, hashesLote) in zip(lotes, pool.imap(procesarLote, lotes)):
+				for rostro, h in zip(rostros, hashesLote):
+					if not deduplicador.esNuevo(h):
+						estado['duplicados'] += 1
+						continue
+					if formato == 'archivos':
+						cv2.imwrite(carpetaRostros + '/rostro_{}.jpg'.format(estado['rostros']), rostro)
+					else:
+						pendientes.append(rostro)
+					estado['rostros'] += 1
+				estado['siguiente'] += len(rutasLote)
+				procesadas += len(rutasLote)
+
+				if time.time() - ultimoGuardado >= cadaSegundos:
+					guardar()
+					ultimoGuardado = time.time()
+				print('\r{}/{} imágenes, {} rostros, {} duplicados, {:.1f} imágenes/s'.format(
+					estado['siguiente'], len(rutas), estado['rostros'], estado['duplicados'],
+					procesadas / (time.time() - inicio)), end='', flush=True)
+		finally:
+			guardar()
+	tiempo = time.time() - inicio
+	print('\nImágenes procesadas: {} en {:.1f} s ({:.1f} imágenes/s)'.format(procesadas, tiempo, procesadas / tiempo if tiempo > 0 else 0))
+	print('Rostros guardados: {} - duplicados descartados: {}'.format(estado['rostros'], estado['duplicados']))
+
+if __name__ == '__main__':
+	main()
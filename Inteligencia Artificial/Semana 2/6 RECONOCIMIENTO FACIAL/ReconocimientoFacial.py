@@ -1,23 +1,56 @@
 import cv2
 import os
+import json
+from registroEtiquetas import RegistroEtiquetas
+from indiceRostros import ReconocedorIndice
+from seguimientoRostros import SeguidorRostros
+from detectorRostros import crearDetector
+from reconocimientoLotes import reconocerLote, dibujarResultados
 
-dataPath = 'C:/Users/Gaby/Desktop/Reconocimiento Facial/Data' #Cambia a la ruta donde hayas almacenado Data
-imagePaths = os.listdir(dataPath)
-print('imagePaths=',imagePaths)
+# Índice de descriptores con búsqueda top-k (python indiceRostros.py lo construye y usa
+# las mismas etiquetas que el modelo LBPH). Se carga al crearlo, no lleva .read()
+usarIndice = False
+umbralIndice = 0.35 # Su distancia es 1 - similitud coseno, ajústalo con tus datos
 
-#face_recognizer = cv2.face.EigenFaceRecognizer_create()
-#face_recognizer = cv2.face.FisherFaceRecognizer_create()
-face_recognizer = cv2.face.LBPHFaceRecognizer_create()
+if usarIndice:
+	face_recognizer = ReconocedorIndice('indiceRostros.npz')
+else:
+	#face_recognizer = cv2.face.EigenFaceRecognizer_create()
+	#face_recognizer = cv2.face.FisherFaceRecognizer_create()
+	face_recognizer = cv2.face.LBPHFaceRecognizer_create()
 
-# Leyendo el modelo
-#face_recognizer.read('modeloEigenFace.xml')
-#face_recognizer.read('modeloFisherFace.xml')
-face_recognizer.read('modeloLBPHFace.xml')
+	# Leyendo el modelo
+	#face_recognizer.read('modeloEigenFace.xml')
+	#face_recognizer.read('modeloFisherFace.xml')
+	face_recognizer.read('modeloLBPHFace.xml')
+
+# Nombres de cada etiqueta, guardados junto al modelo al entrenar (no se necesita la carpeta Data)
+#registro = RegistroEtiquetas.paraModelo('modeloEigenFace.xml')
+#registro = RegistroEtiquetas.paraModelo('modeloFisherFace.xml')
+registro = RegistroEtiquetas.paraModelo('modeloLBPHFace.xml')
+print('Personas=',list(registro.nombres.values()))
+
+# Distancia máxima para aceptar una predicción; evaluacion.py calcula unos con tus datos (umbrales.json)
+umbrales = {'EigenFaces': 5700, 'FisherFaces': 500, 'LBPH': 70}
+if os.path.exists('umbrales.json'):
+	with open('umbrales.json') as f:
+		umbrales.update(json.load(f))
+if usarIndice:
+	umbrales['LBPH'] = umbralIndice
+# Umbral del método cargado: cambia la clave a 'EigenFaces' o 'FisherFaces' si usas esos modelos
+umbral = umbrales['LBPH']
 
 #cap = cv2.VideoCapture(0,cv2.CAP_DSHOW)
 #cap = cv2.VideoCapture('Video.mp4')
 
-faceClassif = cv2.CascadeClassifier(cv2.data.haarcascades+'haarcascade_frontalface_default.xml')
+faceClassif = crearDetector('HAAR', scaleFactor=1.3, minNeighbors=5)
+#faceClassif = crearDetector('SSD', anchoEntrada=300)
+#faceClassif = crearDetector('YUNET', anchoEntrada=320)
+
+# Con seguimiento los rostros se detectan cada 5 frames, se siguen entre detecciones y
+# solo se vuelve a llamar predict() para rostros nuevos o cuando su confianza decae
+usarSeguimiento = True
+seguidor = SeguidorRostros(faceClassif, face_recognizer, cadaN=5)
 
 while True:
 	ret,frame = cap.read()
@@ -25,43 +58,23 @@ while True:
 	gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 	auxFrame = gray.copy()
 
-	faces = faceClassif.detectMultiScale(gray,1.3,5)
+	if usarSeguimiento:
+		resultados = [(pista.caja, pista.resultado) for pista in seguidor.procesar(gray, frame) if pista.resultado is not None]
+	else:
+		# Todos los rostros del frame se recortan a un lote y se reconocen juntos
+		faces = faceClassif.detectar(frame)
+		resultados = [(r.caja, (r.label, r.distancia)) for r in reconocerLote(auxFrame, faces, face_recognizer)]
 
-	for (x,y,w,h) in faces:
-		rostro = auxFrame[y:y+h,x:x+w]
-		rostro = cv2.resize(rostro,(150,150),interpolation= cv2.INTER_CUBIC)
-		result = face_recognizer.predict(rostro)
-
-		cv2.putText(frame,'{}'.format(result),(x,y-5),1,1.3,(255,255,0),1,cv2.LINE_AA)
-		'''
-		# EigenFaces
-		if result[1] < 5700:
-			cv2.putText(frame,'{}'.format(imagePaths[result[0]]),(x,y-25),2,1.1,(0,255,0),1,cv2.LINE_AA)
-			cv2.rectangle(frame, (x,y),(x+w,y+h),(0,255,0),2)
-		else:
-			cv2.putText(frame,'Desconocido',(x,y-20),2,0.8,(0,0,255),1,cv2.LINE_AA)
-			cv2.rectangle(frame, (x,y),(x+w,y+h),(0,0,255),2)
-		
-		# FisherFace
-		if result[1] < 500:
-			cv2.putText(frame,'{}'.format(imagePaths[result[0]]),(x,y-25),2,1.1,(0,255,0),1,cv2.LINE_AA)
-			cv2.rectangle(frame, (x,y),(x+w,y+h),(0,255,0),2)
-		else:
-			cv2.putText(frame,'Desconocido',(x,y-20),2,0.8,(0,0,255),1,cv2.LINE_AA)
-			cv2.rectangle(frame, (x,y),(x+w,y+h),(0,0,255),2)
-		'''
-		# LBPHFace
-		if result[1] < 70:
-			cv2.putText(frame,'{}'.format(imagePaths[result[0]]),(x,y-25),2,1.1,(0,255,0),1,cv2.LINE_AA)
-			cv2.rectangle(frame, (x,y),(x+w,y+h),(0,255,0),2)
-		else:
-			cv2.putText(frame,'Desconocido',(x,y-20),2,0.8,(0,0,255),1,cv2.LINE_AA)
-			cv2.rectangle(frame, (x,y),(x+w,y+h),(0,0,255),2)
+	dibujarResultados(frame, [(caja, result, result[0] if result[1] < umbral else None) for caja, result in resultados], registro)
 		
 	cv2.imshow('frame',frame)
 	k = cv2.waitKey(1)
 	if k == 27:
 		break
 
+if usarSeguimiento:
+	e = seguidor.estadisticas()
+	print('Predicciones/s: {:.1f} (sin seguimiento: {:.1f}, ahorro {:.0%})'.format(
+		e['prediccionesPorSegundo'], e['sinSeguimientoPorSegundo'], e['ahorro']))
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
@@ -0,0 +1,75 @@
+import cv2
+import time
+import numpy as np
+from indiceRostros import DescriptorLBP, IndiceRostros
+
+# Latencia por consulta contra el tamaño de la galería:
+#   LBPH     -> face_recognizer.predict (compara contra todos los histogramas, uno por uno)
+#   Exacto   -> IndiceRostros.buscar (un producto matricial contra toda la galería)
+#   IVF      -> IndiceRostros.buscar con sondas (solo los grupos más cercanos)
+# La galería es sintética: cada identidad es un rostro aleatorio y sus muestras son copias
+# con ruido, así se puede medir el acierto top-1 sin necesitar 100k fotos reales.
+tamanos = [1000, 10000, 100000]
+maxLBPH = 10000    # LBPH tarda demasiado en entrenar con galerías más grandes
+muestrasPorPersona = 5
+consultas = 100
+sondas = 8
+
+def rostrosSinteticos(personas, muestras, semilla=0, desde=0):
+	# Rostros de las personas [desde, desde + personas); la base de cada persona solo
+	# depende de su número, así la galería se puede generar por partes
+	rostros = np.empty((personas * muestras, 150, 150), dtype=np.uint8)
+	for p in range(personas):
+		base = np.random.default_rng(desde + p).integers(0, 256, (30, 30), dtype=np.uint8)
+		base = cv2.resize(base, (150,150), interpolation=cv2.INTER_LINEAR).astype(np.float32)
+		ruido = np.random.default_rng((semilla, desde + p)).normal(0, 12, (muestras, 150, 150))
+		rostros[p * muestras:(p + 1) * muestras] = np.clip(base + ruido, 0, 255)
+	labels = np.repeat(np.arange(desde, desde + personas, dtype=np.int32), muestras)
+	return rostros, labels
+
+def describirGaleria(descriptor, personas, parte=1000):
+	# Genera y describe la galería por partes para no tener 100k rostros en memoria
+	descriptores, labels = [], []
+	for desde in range(0, personas, parte):
+		rostros, l = rostrosSinteticos(min(parte, personas - desde), muestrasPorPersona, desde=desde)
+		descriptores.append(descriptor(rostros))
+		labels.append(l)
+	indice = IndiceRostros(descriptor.dimension)
+	indice.agregar(np.concatenate(descriptores), np.concatenate(labels))
+	return indice
+
+def medir(funcion, repeticiones):
+	inicio = time.perf_counter()
+	resultado = funcion()
+	return (time.perf_counter() - inicio) / repeticiones * 1000, resultado
+
+def main():
+	descriptor = DescriptorLBP()
+	# Tiempos en milisegundos por consulta
+	print('{:>8}{:>14}{:>14}{:>14}{:>12}{:>12}'.format('Galeria', 'LBPH ms', 'Exacto ms', 'IVF ms', 'Top1 exac', 'Top1 IVF'))
+	for tamano in tamanos:
+		personas = tamano // muestrasPorPersona
+		elegidos = np.random.default_rng(0).choice(personas, consultas, replace=False)
+		prueba = np.concatenate([rostrosSinteticos(1, 1, semilla=1, desde=p)[0] for p in elegidos])
+		etiquetasPrueba = elegidos.astype(np.int32)
+
+		tiempoLBPH = None
+		if tamano <= maxLBPH:
+			rostros, labels = rostrosSinteticos(personas, muestrasPorPersona)
+			lbph = cv2.face.LBPHFaceRecognizer_create()
+			lbph.train(list(rostros), labels)
+			tiempoLBPH, _ = medir(lambda: [lbph.predict(r) for r in prueba], consultas)
+			del rostros
+
+		indice = describirGaleria(descriptor, personas)
+		descriptores = descriptor(prueba)
+		tiempoExacto, (l1, _) = medir(lambda: indice.buscar(descriptores, k=1), consultas)
+		indice.entrenarIVF()
+		tiempoIVF, (l2, _) = medir(lambda: indice.buscar(descriptores, k=1, sondas=sondas), consultas)
+
+		print('{:>8}{:>14}{:>14.3f}{:>14.3f}{:>12.1%}{:>12.1%}'.format(
+			tamano, '-' if tiempoLBPH is None else '{:.3f}'.format(tiempoLBPH), tiempoExacto, tiempoIVF,
+			np.mean(l1[:, 0] == etiquetasPrueba), np.mean(l2[:, 0] == etiquetasPrueba)))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,87 @@
+import os
+import json
+import numpy as np
+from cargarDatos import cargarRostros
+
+# Formato del archivo:
+#   [encabezado de TAM_ENCABEZADO bytes] = MAGICO + longitud (uint32) + JSON {alto, ancho, n, nombres}
+#   [n registros] = etiqueta int32 + rostro uint8 (alto, ancho)
+# Los registros se leen con np.memmap, así cada rostro es una vista sobre el archivo (sin copias)
+# y agregar capturas nuevas solo escribe al final del archivo.
+MAGICO = b'ROSTROS1'
+TAM_ENCABEZADO = 65536
+
+def tipoRegistro(alto, ancho):
+	return np.dtype([('label', '<i4'), ('rostro', 'u1', (alto, ancho))])
+
+class DatosRostros():
+	def __init__(self, ruta, tam=(150,150)):
+		# Abre el archivo de rostros, si no existe lo crea vacío
+		self.ruta = ruta
+		if not os.path.exists(ruta):
+			self.alto, self.ancho = tam[1], tam[0]
+			self.n = 0
+			self.nombres = []
+			with open(ruta, 'wb') as f:
+				f.write(self._encabezado())
+		else:
+			with open(ruta, 'rb') as f:
+				if f.read(len(MAGICO)) != MAGICO:
+					raise ValueError('No es un archivo de rostros: ' + ruta)
+				longitud = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+				info = json.loads(f.read(longitud).decode('utf8'))
+			self.alto, self.ancho = info['alto'], info['ancho']
+			self.n = info['n']
+			self.nombres = info['nombres']
+		self.tipo = tipoRegistro(self.alto, self.ancho)
+		self._mapear()
+
+	def _encabezado(self):
+		info = json.dumps({'alto': self.alto, 'ancho': self.ancho, 'n': self.n, 'nombres': self.nombres}).encode('utf8')
+		encabezado = MAGICO + np.uint32(len(info)).tobytes() + info
+		if len(encabezado) > TAM_ENCABEZADO:
+			raise ValueError('Demasiados nombres para el encabezado')
+		return encabezado.ljust(TAM_ENCABEZADO, b'\0')
+
+	def _mapear(self):
+		# Vista de solo lectura sobre los registros ya escritos
+		if self.n == 0:
+			self.registros = np.zeros(0, dtype=self.tipo)
+		else:
+			self.registros = np.memmap(self.ruta, dtype=self.tipo, mode='r', offset=TAM_ENCABEZADO, shape=(self.n,))
+		self.rostros = self.registros['rostro']
+		self.labels = self.registros['label']
+
+	def etiqueta(self, nombre):
+		# Regresa la etiqueta de un nombre, si es nuevo se le asigna la siguiente
+		if nombre not in self.nombres:
+			self.nombres.append(nombre)
+		return self.nombres.index(nombre)
+
+	def agregar(self, rostros, nombre):
+		# Agrega al final del archivo un arreglo (k, alto, ancho) uint8 de rostros de 'nombre'
+		rostros = np.asarray(rostros, dtype=np.uint8).reshape(-1, self.alto, self.ancho)
+		nuevos = np.empty(len(rostros), dtype=self.tipo)
+		nuevos['label'] = self.etiqueta(nombre)
+		nuevos['rostro'] = rostros
+		# Liberamos el mapa actual antes de escribir (en Windows no se puede crecer un archivo mapeado)
+		self.registros = self.rostros = self.labels = None
+		with open(self.ruta, 'r+b') as f:
+			f.seek(TAM_ENCABEZADO + self.n * self.tipo.itemsize)
+			f.write(nuevos.tobytes())
+			self.n = self.n + len(nuevos)
+			f.seek(0)
+			f.write(self._encabezado())
+		self._mapear()
+		return len(nuevos)
+
+	def __len__(self):
+		return self.n
+
+def empaquetarCarpeta(dataPath, ruta, tam=(150,150)):
+	# Convierte una carpeta Data/<persona>/<imagen> existente al archivo empaquetado
+	facesData, labels, nombres = cargarRostros(dataPath, tam)
+	datos = DatosRostros(ruta, tam)
+	for label, nombre in enumerate(nombres):
+		datos.agregar(facesData[labels == label], nombre)
+	return datos
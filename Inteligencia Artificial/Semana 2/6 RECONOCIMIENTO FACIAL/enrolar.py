@@ -0,0 +1,49 @@
+import cv2
+import os
+import time
+import numpy as np
+from cargarDatos import leerImagenes
+from datosEmpaquetados import DatosRostros
+from registroEtiquetas import RegistroEtiquetas
+
+# Agrega una persona nueva a un modelo LBPH ya entrenado con face_recognizer.update(),
+# sin volver a entrenar con los rostros de todos los demás.
+# Primero captura sus rostros con capturandoRostros.py
+personName = 'Gaby'
+dataPath = 'C:/Users/Gaby/Desktop/Reconocimiento Facial/Data' #Cambia a la ruta donde hayas almacenado Data
+archivoDatos = 'rostros.dat'
+modelo = 'modeloLBPHFace.xml'
+
+if not os.path.exists(modelo):
+	print('No existe', modelo, '- entrena primero con entrenandoRF.py')
+	exit()
+
+registro = RegistroEtiquetas.paraModelo(modelo)
+if personName in registro.etiquetas:
+	print('{} ya está en el modelo con la etiqueta {}'.format(personName, registro.etiqueta(personName)))
+	exit()
+
+# Rostros de la persona: del archivo empaquetado o de su carpeta en Data
+datos = DatosRostros(archivoDatos) if os.path.exists(archivoDatos) else None
+if datos is not None and personName in datos.nombres:
+	facesData = datos.rostros[datos.labels == datos.etiqueta(personName)]
+else:
+	personPath = dataPath + '/' + personName
+	rutas = [personPath + '/' + fileName for fileName in os.listdir(personPath)]
+	facesData, validos = leerImagenes(rutas)
+	facesData = facesData[validos]
+print('Rostros de {}: {}'.format(personName, len(facesData)))
+
+# LBPH permite agregar histogramas nuevos a un modelo existente
+face_recognizer = cv2.face.LBPHFaceRecognizer_create()
+face_recognizer.read(modelo)
+label = registro.etiqueta(personName)
+
+print("Actualizando modelo...")
+inicio = time.time()
+face_recognizer.update(list(facesData), np.full(len(facesData), label, dtype=np.int32))
+print("Tiempo de actualización: ", time.time() - inicio)
+
+face_recognizer.write(modelo)
+registro.guardar()
+print("Modelo almacenado... {} tiene la etiqueta {}".format(personName, label))
@@ -1,27 +1,28 @@
 import cv2
 import os
 import numpy as np
+from cargarDatos import cargarRostros
+from datosEmpaquetados import DatosRostros
+from registroEtiquetas import RegistroEtiquetas
 
 dataPath = 'C:/Users/Gaby/Desktop/Reconocimiento Facial/Data' #Cambia a la ruta donde hayas almacenado Data
-peopleList = os.listdir(dataPath)
-print('Lista de personas: ', peopleList)
-
-labels = []
-facesData = []
-label = 0
-
-for nameDir in peopleList:
-	personPath = dataPath + '/' + nameDir
+archivoDatos = 'rostros.dat' # Archivo empaquetado que escribe capturandoRostros.py
+
+if os.path.exists(archivoDatos):
+	# Los rostros se leen directo del archivo mapeado en memoria, sin decodificar JPEG
+	datos = DatosRostros(archivoDatos)
+	facesData, labels, peopleList = datos.rostros, datos.labels, datos.nombres
+else:
+	# Leemos todas las imágenes en paralelo a un solo arreglo (N,150,150) uint8
 	print('Leyendo las imágenes')
+	facesData, labels, peopleList = cargarRostros(dataPath)
+print('Lista de personas: ', peopleList)
 
-	for fileName in os.listdir(personPath):
-		print('Rostros: ', nameDir + '/' + fileName)
-		labels.append(label)
-		facesData.append(cv2.imread(personPath+'/'+fileName,0))
-		#image = cv2.imread(personPath+'/'+fileName,0)
-		#cv2.imshow('image',image)
-		#cv2.waitKey(10)
-	label = label + 1
+# Las etiquetas salen del registro guardado junto al modelo: cada persona conserva su
+# etiqueta aunque cambien las carpetas, y las personas nuevas reciben la siguiente libre
+registro = RegistroEtiquetas.paraModelo('modeloLBPHFace.xml')
+mapa = np.array([registro.etiqueta(nombre) for nombre in peopleList], dtype=np.int32)
+labels = mapa[np.asarray(labels)]
 
 #print('labels= ',labels)
 #print('Número de etiquetas 0: ',np.count_nonzero(np.array(labels)==0))
@@ -34,10 +35,13 @@ face_recognizer = cv2.face.LBPHFaceRecognizer_create()
 
 # Entrenando el reconocedor de rostros
 print("Entrenando...")
-face_recognizer.train(facesData, np.array(labels))
+face_recognizer.train(list(facesData), labels)
 
 # Almacenando el modelo obtenido
 #face_recognizer.write('modeloEigenFace.xml')
 #face_recognizer.write('modeloFisherFace.xml')
 face_recognizer.write('modeloLBPHFace.xml')
+# Guardamos la relación etiqueta -> nombre junto al modelo (modeloLBPHFace.json),
+# ReconocimientoFacial.py y enrolar.py la leen de ahí
+registro.guardar()
 print("Modelo almacenado...")
\ No newline at end of file
@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+
+# Hash perceptual de rostros y descarte de casi duplicados, compartido por extraccionMasiva.py
+# y calidadRostros.py (cada carpeta que lo usa lleva su copia, como detectorRostros.py)
+
+def hashPerceptual(gris):
+	# pHash de 64 bits: frecuencias bajas de la DCT comparadas contra su mediana
+	pequena = cv2.resize(gris, (32,32), interpolation=cv2.INTER_AREA).astype(np.float32)
+	bajas = cv2.dct(pequena)[:8, :8].ravel()
+	bits = bajas > np.median(bajas[1:])
+	return int(np.packbits(bits).view('>u8')[0])
+
+class Deduplicador():
+	# Descarta los hashes a 'distancia' bits o menos de alguno ya visto. El hash se parte en
+	# distancia + 1 bandas: dos hashes así de cercanos coinciden exacto en al menos una banda,
+	# por lo que solo se comparan los que comparten alguna (no toda la lista)
+	def __init__(self, distancia, hashes=()):
+		self.distancia = distancia
+		limites = np.linspace(0, 64, distancia + 2).astype(int)
+		self.bandas = [(int(a), (1 << int(b - a)) - 1) for a, b in zip(limites[:-1], limites[1:])]
+		self.tablas = [{} for _ in self.bandas]
+		self.hashes = []
+		for h in hashes:
+			self._agregar(int(h))
+
+	def _agregar(self, h):
+		self.hashes.append(h)
+		for (desplazamiento, mascara), tabla in zip(self.bandas, self.tablas):
+			tabla.setdefault((h >> desplazamiento) & mascara, []).append(h)
+
+	def esNuevo(self, h):
+		for (desplazamiento, mascara), tabla in zip(self.bandas, self.tablas):
+			for otro in tabla.get((h >> desplazamiento) & mascara, ()):
+				if bin(h ^ otro).count('1') <= self.distancia:
+					return False
+		self._agregar(h)
+		return True
@@ -0,0 +1,213 @@
+import cv2
+import os
+import numpy as np
+
+# ------------------------- Descriptores de tamaño fijo por rostro -------------------------
+
+def _tablaUniforme():
+	# LBP uniforme: los 58 códigos con a lo más 2 transiciones 0/1 tienen su propio bin,
+	# todos los demás comparten el bin 58
+	tabla = np.full(256, 58, dtype=np.int64)
+	siguiente = 0
+	for codigo in range(256):
+		bits = [(codigo >> i) & 1 for i in range(8)]
+		if sum(bits[i] != bits[(i + 1) % 8] for i in range(8)) <= 2:
+			tabla[codigo] = siguiente
+			siguiente = siguiente + 1
+	return tabla
+
+TABLA_UNIFORME = _tablaUniforme()
+VECINOS = [(-1,-1), (-1,0), (-1,1), (0,1), (1,1), (1,0), (1,-1), (0,-1)]
+
+class DescriptorLBP():
+	# Histogramas LBP uniformes en una rejilla de celdas (como LBPH), calculados para
+	# muchos rostros a la vez. Se aplica raíz cuadrada y norma L2, así el producto punto
+	# entre dos descriptores es su similitud coseno
+	def __init__(self, rejilla=(5,5), lote=256):
+		self.rejilla = rejilla
+		self.lote = lote
+		self.dimension = rejilla[0] * rejilla[1] * 59
+
+	def __call__(self, rostros):
+		rostros = np.asarray(rostros, dtype=np.uint8)
+		if rostros.ndim == 2:
+			rostros = rostros[None]
+		salida = np.empty((len(rostros), self.dimension), dtype=np.float32)
+		for i in range(0, len(rostros), self.lote):
+			salida[i:i + self.lote] = self._lote(rostros[i:i + self.lote])
+		return salida
+
+	def _lote(self, rostros):
+		n, alto, ancho = rostros.shape
+		centro = rostros[:, 1:-1, 1:-1]
+		codigos = np.zeros(centro.shape, dtype=np.uint8)
+		for bit, (dy, dx) in enumerate(VECINOS):
+			vecino = rostros[:, 1 + dy:alto - 1 + dy, 1 + dx:ancho - 1 + dx]
+			codigos |= (vecino >= centro).astype(np.uint8) << bit
+		codigos = TABLA_UNIFORME[codigos]
+
+		# Celda de cada pixel y un solo bincount para todos los rostros del lote
+		h, w = codigos.shape[1:]
+		gy, gx = self.rejilla
+		celda = (np.arange(h)[:, None] * gy // h) * gx + (np.arange(w)[None, :] * gx // w)
+		celdas = gy * gx
+		indices = (np.arange(n)[:, None, None] * celdas + celda[None]) * 59 + codigos
+		hist = np.bincount(indices.ravel(), minlength=n * celdas * 59).astype(np.float32)
+		hist = np.sqrt(hist.reshape(n, -1))
+		hist /= np.maximum(np.linalg.norm(hist, axis=1, keepdims=True), 1e-12)
+		return hist
+
+class DescriptorSFace():
+	# Embedding de 128 valores con la red SFace de cv2 (face_recognition_sface_2021dec.onnx,
+	# se descarga del repositorio opencv_zoo). Recibe rostros en gris de 150x150
+	def __init__(self, modelo='face_recognition_sface_2021dec.onnx'):
+		self.red = cv2.FaceRecognizerSF.create(modelo, '')
+		self.dimension = 128
+
+	def __call__(self, rostros):
+		rostros = np.asarray(rostros, dtype=np.uint8)
+		if rostros.ndim == 2:
+			rostros = rostros[None]
+		salida = np.empty((len(rostros), self.dimension), dtype=np.float32)
+		for i, rostro in enumerate(rostros):
+			rostro = cv2.cvtColor(cv2.resize(rostro, (112,112), interpolation=cv2.INTER_AREA), cv2.COLOR_GRAY2BGR)
+			salida[i] = self.red.feature(rostro).ravel()
+		salida /= np.maximum(np.linalg.norm(salida, axis=1, keepdims=True), 1e-12)
+		return salida
+
+# ------------------------------ Índice de búsqueda top-k --------------------------------
+
+class IndiceRostros():
+	# Guarda los descriptores normalizados en una matriz (N, D) y busca los k más parecidos
+	# con un producto matricial. Con entrenarIVF() además agrupa la galería con k-means
+	# y cada consulta solo se compara con los 'sondas' grupos más cercanos (para 100k+ rostros)
+	def __init__(self, dimension):
+		self.matriz = np.zeros((0, dimension), dtype=np.float32)
+		self.labels = np.zeros(0, dtype=np.int32)
+		self.centroides = None
+
+	def agregar(self, descriptores, labels):
+		self.matriz = np.concatenate([self.matriz, np.asarray(descriptores, dtype=np.float32)])
+		self.labels = np.concatenate([self.labels, np.asarray(labels, dtype=np.int32)])
+		if self.centroides is not None:
+			self._asignarListas()
+
+	def entrenarIVF(self, listas=None, iteraciones=20):
+		listas = listas or max(1, int(np.sqrt(len(self.matriz))))
+		criterio = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, iteraciones, 1e-4)
+		_, _, centroides = cv2.kmeans(self.matriz, listas, None, criterio, 1, cv2.KMEANS_PP_CENTERS)
+		centroides /= np.maximum(np.linalg.norm(centroides, axis=1, keepdims=True), 1e-12)
+		self.centroides = centroides
+		self._asignarListas()
+
+	def _asignarListas(self):
+		# Ordenamos la galería por grupo, así cada lista es un rango contiguo de la matriz
+		grupo = (self.matriz @ self.centroides.T).argmax(axis=1)
+		orden = np.argsort(grupo, kind='stable')
+		self.matriz, self.labels = self.matriz[orden], self.labels[orden]
+		self.inicios = np.searchsorted(grupo[orden], np.arange(len(self.centroides) + 1))
+
+	def buscar(self, consultas, k=1, sondas=None):
+		# Regresa (labels, similitudes) de forma (Q, k), ordenados de mayor a menor similitud
+		consultas = np.atleast_2d(np.asarray(consultas, dtype=np.float32))
+		if sondas is None or self.centroides is None:
+			return self._topk(consultas @ self.matriz.T, np.arange(len(self.matriz)), k)
+
+		grupos = np.argsort(-(consultas @ self.centroides.T), axis=1)[:, :sondas]
+		# Pares (consulta, grupo) ordenados por grupo: cada grupo sondeado se compara una sola vez
+		# con todas las consultas que lo eligieron, contra su rango contiguo de la matriz (sin copiarlo)
+		paresQ = np.repeat(np.arange(len(consultas)), grupos.shape[1])
+		paresG = grupos.ravel()
+		orden = np.argsort(paresG, kind='stable')
+		paresQ, paresG = paresQ[orden], paresG[orden]
+		cortes = np.flatnonzero(np.diff(paresG)) + 1
+		posiciones = np.full((len(consultas), k), -1, dtype=np.int64)
+		similitudes = np.full((len(consultas), k), -np.inf, dtype=np.float32)
+		for qs, g in zip(np.split(paresQ, cortes), paresG[np.concatenate([[0], cortes])] if len(paresG) else []):
+			a, b = self.inicios[g], self.inicios[g + 1]
+			if a == b:
+				continue
+			s = consultas[qs] @ self.matriz[a:b].T
+			kk = min(k, b - a)
+			mejores = np.argpartition(-s, kk - 1, axis=1)[:, :kk]
+			# Se unen con los mejores que ya tenía cada consulta de otros grupos
+			union = np.concatenate([similitudes[qs], np.take_along_axis(s, mejores, axis=1)], axis=1)
+			unionPos = np.concatenate([posiciones[qs], mejores + a], axis=1)
+			top = np.argpartition(-union, k - 1, axis=1)[:, :k]
+			similitudes[qs] = np.take_along_axis(union, top, axis=1)
+			posiciones[qs] = np.take_along_axis(unionPos, top, axis=1)
+		orden = np.argsort(-similitudes, axis=1)
+		similitudes = np.take_along_axis(similitudes, orden, axis=1)
+		posiciones = np.take_along_axis(posiciones, orden, axis=1)
+		labels = np.where(posiciones >= 0, self.labels[np.maximum(posiciones, 0)], -1).astype(np.int32)
+		return labels, similitudes
+
+	def _topk(self, similitudes, candidatos, k):
+		k = min(k, similitudes.shape[1])
+		if k == 0:
+			return np.zeros((len(similitudes), 0), dtype=np.int32), np.zeros((len(similitudes), 0), dtype=np.float32)
+		mejores = np.argpartition(-similitudes, k - 1, axis=1)[:, :k]
+		valores = np.take_along_axis(similitudes, mejores, axis=1)
+		orden = np.argsort(-valores, axis=1)
+		mejores = np.take_along_axis(mejores, orden, axis=1)
+		return self.labels[candidatos[mejores]], np.take_along_axis(valores, orden, axis=1)
+
+	def guardar(self, ruta):
+		datos = {'matriz': self.matriz, 'labels': self.labels}
+		if self.centroides is not None:
+			datos['centroides'] = self.centroides
+			datos['inicios'] = self.inicios
+		np.savez(ruta, **datos)
+
+	@staticmethod
+	def cargar(ruta):
+		datos = np.load(ruta)
+		indice = IndiceRostros(datos['matriz'].shape[1])
+		indice.matriz, indice.labels = datos['matriz'], datos['labels']
+		if 'centroides' in datos:
+			indice.centroides, indice.inicios = datos['centroides'], datos['inicios']
+		return indice
+
+class ReconocedorIndice():
+	# Misma forma de uso que cv2.face: predict(rostro) -> (label, distancia), con
+	# distancia = 1 - similitud coseno del rostro más parecido (0 = idéntico)
+	def __init__(self, ruta='indiceRostros.npz', descriptor=None, sondas=None):
+		self.descriptor = descriptor or DescriptorLBP()
+		self.indice = IndiceRostros.cargar(ruta)
+		self.sondas = sondas
+
+	def predict(self, rostro):
+		labels, similitudes = self.indice.buscar(self.descriptor(rostro), k=1, sondas=self.sondas)
+		return int(labels[0, 0]), float(1 - similitudes[0, 0])
+
+	def predictLote(self, rostros):
+		# Todos los rostros de un frame (N, 150, 150) contra la galería en una sola búsqueda
+		labels, similitudes = self.indice.buscar(self.descriptor(rostros), k=1, sondas=self.sondas)
+		return labels[:, 0], 1 - similitudes[:, 0]
+
+def construirIndice(facesData, labels, descriptor=None, listas=0):
+	descriptor = descriptor or DescriptorLBP()
+	indice = IndiceRostros(descriptor.dimension)
+	indice.agregar(descriptor(facesData), labels)
+	if listas:
+		indice.entrenarIVF(listas)
+	return indice
+
+if __name__ == '__main__':
+	# Construye indiceRostros.npz con los mismos datos y etiquetas que entrenandoRF.py
+	from datosEmpaquetados import DatosRostros
+	from registroEtiquetas import RegistroEtiquetas
+	archivoDatos = 'rostros.dat'
+	if not os.path.exists(archivoDatos):
+		print('No existe', archivoDatos, '- captura rostros con capturandoRostros.py')
+		exit()
+	datos = DatosRostros(archivoDatos)
+	# Usamos el mismo registro de etiquetas que el modelo LBPH
+	registro = RegistroEtiquetas.paraModelo('modeloLBPHFace.xml')
+	mapa = np.array([registro.etiqueta(nombre) for nombre in datos.nombres], dtype=np.int32)
+	# Con muchas personas conviene el índice IVF (ReconocedorIndice(..., sondas=8))
+	listas = int(np.sqrt(len(datos))) if len(datos) >= 100000 else 0
+	indice = construirIndice(datos.rostros, mapa[np.asarray(datos.labels)], listas=listas)
+	indice.guardar('indiceRostros.npz')
+	registro.guardar()
+	print('Índice almacenado: {} rostros, {} dimensiones'.format(*indice.matriz.shape))
@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+from collections import namedtuple
+
+# Resultado de reconocer un rostro: caja (x, y, w, h) en el frame, etiqueta y distancia
+Resultado = namedtuple('Resultado', ['caja', 'label', 'distancia'])
+
+def recortarLote(gray, cajas, tam=(150,150)):
+	# Recorta y redimensiona todas las cajas del frame dentro de un solo arreglo (N, alto, ancho)
+	rostros = np.empty((len(cajas), tam[1], tam[0]), dtype=np.uint8)
+	for i, (x, y, w, h) in enumerate(cajas):
+		x, y = max(int(x), 0), max(int(y), 0)
+		cv2.resize(gray[y:y+int(h), x:x+int(w)], tam, dst=rostros[i], interpolation=cv2.INTER_CUBIC)
+	return rostros
+
+def predecirLote(recognizer, rostros):
+	# Regresa (labels, distancias) para todos los rostros. Los reconocedores con predictLote
+	# (ReconocedorIndice) los comparan contra la galería en una sola llamada; los de cv2.face
+	# no tienen versión por lotes y se llaman uno por uno
+	if hasattr(recognizer, 'predictLote'):
+		return recognizer.predictLote(rostros)
+	labels = np.empty(len(rostros), dtype=np.int32)
+	distancias = np.empty(len(rostros), dtype=np.float64)
+	for i, rostro in enumerate(rostros):
+		labels[i], distancias[i] = recognizer.predict(rostro)
+	return labels, distancias
+
+def reconocerLote(gray, cajas, recognizer, tam=(150,150)):
+	# Reconoce todas las cajas de un frame y regresa una lista de Resultado
+	cajas = [tuple(int(v) for v in caja) for caja in cajas]
+	if len(cajas) == 0:
+		return []
+	labels, distancias = predecirLote(recognizer, recortarLote(gray, cajas, tam))
+	return [Resultado(caja, int(l), float(d)) for caja, l, d in zip(cajas, labels, distancias)]
+
+def dibujarResultados(frame, resultados, registro, desconocido='Desconocido'):
+	# Etapa de dibujo, aparte del reconocimiento. Cada resultado es (caja, (label, distancia),
+	# etiqueta): verde con el nombre de 'etiqueta', o rojo con 'desconocido' si es None (la
+	# distancia no pasó el umbral, o así lo decidió el voto). Regresa el nombre del último
+	# rostro dibujado, None si no se identificó o no hubo rostros
+	nombre = None
+	for (x,y,w,h), result, etiqueta in resultados:
+		cv2.putText(frame,'{}'.format(result),(x,y-5),1,1.3,(255,255,0),1,cv2.LINE_AA)
+		if etiqueta is not None:
+			nombre = registro.nombre(etiqueta)
+			cv2.putText(frame,'{}'.format(nombre),(x,y-25),2,1.1,(0,255,0),1,cv2.LINE_AA)
+			cv2.rectangle(frame, (x,y),(x+w,y+h),(0,255,0),2)
+		else:
+			nombre = None
+			cv2.putText(frame,desconocido,(x,y-20),2,0.8,(0,0,255),1,cv2.LINE_AA)
+			cv2.rectangle(frame, (x,y),(x+w,y+h),(0,0,255),2)
+	return nombre
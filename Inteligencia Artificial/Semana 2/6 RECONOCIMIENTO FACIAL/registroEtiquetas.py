@@ -0,0 +1,45 @@
+import os
+import json
+
+class RegistroEtiquetas():
+	# Relación etiqueta <-> nombre que se guarda junto al modelo (modeloLBPHFace.xml ->
+	# modeloLBPHFace.json), así las etiquetas no dependen del orden de os.listdir
+	# Si se da la lista de 'nombres' se crea un registro nuevo donde la etiqueta de cada
+	# nombre es su posición en la lista; si no, se carga el archivo (si existe)
+	def __init__(self, ruta, nombres=None):
+		self.ruta = ruta
+		self.nombres = {}   # etiqueta -> nombre
+		self.etiquetas = {} # nombre -> etiqueta
+		self.siguiente = 0
+		if nombres is not None:
+			for nombre in nombres:
+				self.etiqueta(nombre)
+		elif os.path.exists(ruta):
+			with open(ruta, 'r', encoding='utf8') as f:
+				for etiqueta, nombre in json.load(f)['etiquetas'].items():
+					self.nombres[int(etiqueta)] = nombre
+					self.etiquetas[nombre] = int(etiqueta)
+					self.siguiente = max(self.siguiente, int(etiqueta) + 1)
+
+	@staticmethod
+	def paraModelo(rutaModelo):
+		return RegistroEtiquetas(os.path.splitext(rutaModelo)[0] + '.json')
+
+	def nombre(self, etiqueta):
+		# Si el modelo se entrenó sin registro (o la etiqueta no está) se muestra el número
+		return self.nombres.get(int(etiqueta), str(etiqueta))
+
+	def etiqueta(self, nombre):
+		# Regresa la etiqueta de 'nombre'; si es nuevo le asigna la siguiente libre
+		if nombre not in self.etiquetas:
+			self.nombres[self.siguiente] = nombre
+			self.etiquetas[nombre] = self.siguiente
+			self.siguiente = self.siguiente + 1
+		return self.etiquetas[nombre]
+
+	def guardar(self):
+		with open(self.ruta, 'w', encoding='utf8') as f:
+			json.dump({'etiquetas': {str(k): v for k, v in sorted(self.nombres.items())}}, f, ensure_ascii=False, indent=1)
+
+	def __len__(self):
+		return len(self.nombres)
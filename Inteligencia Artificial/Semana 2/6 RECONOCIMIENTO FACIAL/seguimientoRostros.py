@@ -0,0 +1,166 @@
+import cv2
+import time
+import numpy as np
+from reconocimientoLotes import recortarLote, predecirLote
+
+class Pista():
+	# Un rostro seguido entre frames con su último resultado de predict() en caché
+	def __init__(self, id, caja):
+		self.id = id
+		self.caja = caja
+		self.resultado = None
+		self.confianza = 0.0
+		self.puntos = None
+		self.ultimaPrediccion = -1
+		self.voto = None
+
+def iou(a, b):
+	ax, ay, aw, ah = a
+	bx, by, bw, bh = b
+	ancho = min(ax + aw, bx + bw) - max(ax, bx)
+	alto = min(ay + ah, by + bh) - max(ay, by)
+	if ancho <= 0 or alto <= 0:
+		return 0.0
+	interseccion = ancho * alto
+	return interseccion / float(aw * ah + bw * bh - interseccion)
+
+class SeguidorRostros():
+	# Detecta rostros solo cada 'cadaN' frames y entre detecciones mueve las cajas con flujo
+	# óptico (Lucas-Kanade). Cada pista guarda su resultado de predict() y solo se vuelve a
+	# predecir cuando la pista es nueva o su confianza, que decae por frame y con la calidad
+	# del seguimiento, baja de 'minConfianza'.
+	# Con 'cadaPrediccion' cada pista además se vuelve a predecir cada ese número de frames, y
+	# con 'crearVoto' (por ejemplo lambda: VotoTemporal(60), de votacionTemporal.py) cada
+	# pista junta sus predicciones en pista.voto para decidir una etiqueta estable.
+	def __init__(self, faceClassif, recognizer, cadaN=5, decaimiento=0.97, minConfianza=0.5,
+				scaleFactor=1.3, minNeighbors=5, tam=(150,150), cadaPrediccion=None, crearVoto=None):
+		self.faceClassif = faceClassif
+		self.recognizer = recognizer
+		self.cadaN = cadaN
+		self.decaimiento = decaimiento
+		self.minConfianza = minConfianza
+		self.scaleFactor = scaleFactor
+		self.minNeighbors = minNeighbors
+		self.tam = tam
+		self.cadaPrediccion = cadaPrediccion
+		self.crearVoto = crearVoto
+		# Totales de las estadísticas de los votos de todas las pistas; se acumulan al votar
+		# para no guardar los votos de pistas que ya terminaron
+		self.totalVotos = dict.fromkeys(('cambiosCrudos', 'cambiosEstables', 'sumaLatencias', 'cambiosMedidos'), 0)
+		self.pistas = []
+		self.siguienteId = 0
+		self.frame = 0
+		self.grayAnterior = None
+		# Estadísticas: predicciones hechas contra las que haría el script original
+		self.inicio = time.time()
+		self.predicciones = 0
+		self.rostrosVistos = 0
+
+	def procesar(self, gray, frame=None):
+		# Regresa la lista de pistas activas para este frame (gray en escala de grises).
+		# Si se pasa el frame a color se detecta sobre él (los detectores de cv2.dnn lo necesitan)
+		if self.frame % self.cadaN == 0 or self.grayAnterior is None:
+			self._detectar(gray, gray if frame is None else frame)
+		else:
+			self._seguir(gray)
+		self.frame = self.frame + 1
+		self.grayAnterior = gray
+
+		pendientes = [p for p in self.pistas if p.resultado is None or p.confianza < self.minConfianza
+					or (self.cadaPrediccion and self.frame - p.ultimaPrediccion >= self.cadaPrediccion)]
+		if len(pendientes) > 0:
+			self._predecir(gray, pendientes)
+		self.rostrosVistos += len(self.pistas)
+		return self.pistas
+
+	def _detectar(self, gray, imagen):
+		# faceClassif puede ser un detector de detectorRostros.py o un cv2.CascadeClassifier
+		if hasattr(self.faceClassif, 'detectar'):
+			faces = self.faceClassif.detectar(imagen)
+		else:
+			faces = self.faceClassif.detectMultiScale(gray, self.scaleFactor, self.minNeighbors)
+		pistas = []
+		libres = list(self.pistas)
+		for caja in faces:
+			caja = tuple(int(v) for v in caja)
+			mejor = max(libres, key=lambda p: iou(p.caja, caja), default=None)
+			if mejor is not None and iou(mejor.caja, caja) > 0.3:
+				# Misma persona: conservamos su identidad y solo corregimos la caja
+				libres.remove(mejor)
+				mejor.caja = caja
+			else:
+				mejor = Pista(self.siguienteId, caja)
+				self.siguienteId += 1
+			mejor.puntos = self._puntos(gray, caja)
+			pistas.append(mejor)
+		self.pistas = pistas
+
+	def _puntos(self, gray, caja):
+		x, y, w, h = caja
+		mascara = np.zeros(gray.shape, dtype=np.uint8)
+		mascara[y:y+h, x:x+w] = 255
+		return cv2.goodFeaturesToTrack(gray, 30, 0.01, 5, mask=mascara)
+
+	def _seguir(self, gray):
+		# Un solo calcOpticalFlowPyrLK para los puntos de todas las pistas
+		conPuntos = [p for p in self.pistas if p.puntos is not None and len(p.puntos) > 0]
+		self.pistas = conPuntos
+		if len(conPuntos) == 0:
+			return
+		anteriores = np.concatenate([p.puntos for p in conPuntos]).astype(np.float32)
+		nuevos, estado, _ = cv2.calcOpticalFlowPyrLK(self.grayAnterior, gray, anteriores, None)
+		estado = estado.ravel().astype(bool)
+
+		vivas = []
+		inicio = 0
+		for pista in conPuntos:
+			fin = inicio + len(pista.puntos)
+			ok = estado[inicio:fin]
+			calidad = float(ok.mean())
+			if calidad >= 0.4:
+				dx, dy = np.median(nuevos[inicio:fin][ok] - anteriores[inicio:fin][ok], axis=0).ravel()
+				x, y, w, h = pista.caja
+				pista.caja = (int(round(x + dx)), int(round(y + dy)), w, h)
+				pista.puntos = nuevos[inicio:fin][ok].reshape(-1, 1, 2)
+				pista.confianza *= self.decaimiento * calidad
+				vivas.append(pista)
+			inicio = fin
+		self.pistas = vivas
+
+	def _predecir(self, gray, pistas):
+		# Todas las pistas pendientes del frame se recortan a un lote y se predicen juntas
+		alto, ancho = gray.shape
+		pistas = [p for p in pistas if p.caja[0] < ancho and p.caja[1] < alto
+				and p.caja[0] + p.caja[2] > 0 and p.caja[1] + p.caja[3] > 0]
+		if len(pistas) == 0:
+			return
+		labels, distancias = predecirLote(self.recognizer, recortarLote(gray, [p.caja for p in pistas], self.tam))
+		for pista, label, distancia in zip(pistas, labels, distancias):
+			pista.resultado = (int(label), float(distancia))
+			pista.confianza = 1.0
+			pista.ultimaPrediccion = self.frame
+			if self.crearVoto is not None:
+				if pista.voto is None:
+					pista.voto = self.crearVoto()
+				antes = {clave: getattr(pista.voto, clave) for clave in self.totalVotos}
+				pista.voto.agregar(label, distancia, self.frame)
+				for clave in self.totalVotos:
+					self.totalVotos[clave] += getattr(pista.voto, clave) - antes[clave]
+		self.predicciones += len(pistas)
+
+	def estadisticas(self):
+		# Predicciones por segundo con seguimiento contra las del modo cuadro por cuadro
+		tiempo = max(time.time() - self.inicio, 1e-6)
+		estadisticas = {
+			'prediccionesPorSegundo': self.predicciones / tiempo,
+			'sinSeguimientoPorSegundo': self.rostrosVistos / tiempo,
+			'ahorro': 1 - self.predicciones / self.rostrosVistos if self.rostrosVistos else 0.0,
+			'fps': self.frame / tiempo,
+		}
+		if self.crearVoto is not None:
+			# Estabilidad contra latencia del voto temporal de todas las pistas
+			total = self.totalVotos
+			estadisticas['cambiosCrudos'] = total['cambiosCrudos']
+			estadisticas['cambiosEstables'] = total['cambiosEstables']
+			estadisticas['latenciaFrames'] = total['sumaLatencias'] / total['cambiosMedidos'] if total['cambiosMedidos'] else 0.0
+		return estadisticas
@@ -0,0 +1,52 @@
+class VotoTemporal():
+	# Decide la etiqueta (persona o emoción) de una pista con un voto de promedio móvil
+	# exponencial sobre sus últimas ~'ventana' predicciones, en lugar de usar solo la última.
+	# Las predicciones con distancia >= umbral votan por None (No identificado). La etiqueta
+	# mostrada solo cambia cuando otra la supera por 'histeresis', así una predicción aislada
+	# no la hace parpadear.
+	#
+	# Más ventana o histéresis = etiqueta más estable pero tarda más en cambiar; con
+	# SeguidorRostros(cadaPrediccion=N) cada predicción equivale a N frames de latencia.
+	def __init__(self, umbral, ventana=5, histeresis=0.2):
+		self.umbral = umbral
+		self.alfa = 2.0 / (ventana + 1)
+		self.histeresis = histeresis
+		self.votos = {}
+		self.etiqueta = None
+		self.ultima = None
+		self.inicioRacha = 0
+		self.predicciones = 0
+		# Estadísticas: cambios de la predicción cruda contra cambios de la etiqueta mostrada,
+		# y frames desde que empezó la racha de la etiqueta nueva hasta que se mostró (suma y
+		# cuántos cambios se midieron, para el promedio)
+		self.cambiosCrudos = 0
+		self.cambiosEstables = 0
+		self.sumaLatencias = 0
+		self.cambiosMedidos = 0
+
+	def agregar(self, label, distancia, frame):
+		cruda = int(label) if distancia < self.umbral else None
+		self.predicciones += 1
+		if self.predicciones == 1:
+			# La primera predicción se muestra de inmediato
+			self.votos = {cruda: 1.0}
+			self.etiqueta = self.ultima = cruda
+			self.inicioRacha = frame
+			return self.etiqueta
+
+		if cruda != self.ultima:
+			self.cambiosCrudos += 1
+			self.ultima = cruda
+			self.inicioRacha = frame
+		for clave in self.votos:
+			self.votos[clave] *= 1 - self.alfa
+		self.votos[cruda] = self.votos.get(cruda, 0.0) + self.alfa
+
+		mejor = max(self.votos, key=self.votos.get)
+		if mejor != self.etiqueta and self.votos[mejor] >= self.votos.get(self.etiqueta, 0.0) + self.histeresis:
+			self.etiqueta = mejor
+			self.cambiosEstables += 1
+			if mejor == cruda:
+				self.sumaLatencias += frame - self.inicioRacha
+				self.cambiosMedidos += 1
+		return self.etiqueta
@@ -0,0 +1,109 @@
+import cv2
+import queue
+import threading
+import numpy as np
+from hashRostros import hashPerceptual, Deduplicador
+
+# Filtro de calidad para capturandoRostros.py: de la cámara salen muchos rostros casi iguales
+# (frames seguidos) o movidos, que solo hacen más grande el conjunto y más lento el
+# entrenamiento. Cada recorte se califica por nitidez, pose y novedad y solo se guarda si
+# aporta algo; la escritura a disco la hace un hilo aparte para no frenar la cámara.
+
+def nitidez(gris):
+	# Varianza del Laplaciano: baja en rostros movidos o fuera de foco
+	return float(cv2.Laplacian(gris, cv2.CV_64F).var())
+
+def descriptorPose(gris):
+	# Giro (x) e inclinación (y) aproximados sin puntos faciales: el centroide de los bordes
+	# (ojos, nariz, boca) respecto al centro del recorte, entre -1 y 1. Al voltear la cabeza
+	# los rasgos se recorren hacia un lado del recuadro del detector
+	pequena = cv2.resize(gris, (48,48), interpolation=cv2.INTER_AREA).astype(np.float32)
+	magnitud = cv2.magnitude(cv2.Sobel(pequena, cv2.CV_32F, 1, 0), cv2.Sobel(pequena, cv2.CV_32F, 0, 1))
+	m = cv2.moments(magnitud)
+	if m['m00'] == 0:
+		return 0.0, 0.0
+	return m['m10'] / m['m00'] / 23.5 - 1, m['m01'] / m['m00'] / 23.5 - 1
+
+class FiltroCalidad():
+	# evaluar(gris) regresa (aceptado, motivo) para un rostro ya recortado a 150x150 en grises.
+	# Las pruebas van de la más barata a la más cara y el hash solo se registra si el rostro
+	# pasa todas, así un rostro rechazado no bloquea a los siguientes:
+	#   'borroso'   nitidez < nitidezMinima
+	#   'pose'      su celda de pose (celdasPose x celdasPose sobre ±rangoPose) ya tiene maxPorPose
+	#               (tras 'liberarPose' rechazos seguidos por pose el límite se quita: la persona
+	#               no está mostrando otras poses y de otro modo nunca se llegaría a maxRostros)
+	#   'duplicado' a distanciaHash bits o menos de un rostro ya guardado
+	def __init__(self, nitidezMinima=30, distanciaHash=6, celdasPose=4, rangoPose=0.15, maxPorPose=None, liberarPose=100):
+		self.nitidezMinima = nitidezMinima
+		self.celdasPose = celdasPose
+		self.rangoPose = rangoPose
+		self.maxPorPose = maxPorPose
+		self.liberarPose = liberarPose
+		self.rechazosPose = 0 # Rechazos por pose seguidos
+		self.deduplicador = Deduplicador(distanciaHash)
+		self.poses = np.zeros((celdasPose, celdasPose), dtype=np.int32)
+		self.evaluados = 0
+		self.rechazos = {'borroso': 0, 'pose': 0, 'duplicado': 0}
+		self.sumaNitidez = 0.0
+
+	def celda(self, gris):
+		giro, inclinacion = descriptorPose(gris)
+		indices = np.clip((np.array([inclinacion, giro]) / self.rangoPose + 1) / 2 * self.celdasPose, 0, self.celdasPose - 1)
+		return tuple(indices.astype(int))
+
+	def evaluar(self, gris):
+		self.evaluados += 1
+		valor = nitidez(gris)
+		self.sumaNitidez += valor
+		if valor < self.nitidezMinima:
+			return self._rechazar('borroso')
+		celda = self.celda(gris)
+		if self.maxPorPose is not None and self.poses[celda] >= self.maxPorPose:
+			self.rechazosPose += 1
+			if self.liberarPose is None or self.rechazosPose < self.liberarPose:
+				return self._rechazar('pose')
+			print('Sin poses nuevas en {} rostros, se quita el límite de {} por pose'.format(self.rechazosPose, self.maxPorPose))
+			self.maxPorPose = None
+		self.rechazosPose = 0
+		if not self.deduplicador.esNuevo(hashPerceptual(gris)):
+			return self._rechazar('duplicado')
+		self.poses[celda] += 1
+		return True, None
+
+	def _rechazar(self, motivo):
+		self.rechazos[motivo] += 1
+		return False, motivo
+
+	def resumen(self):
+		aceptados = self.evaluados - sum(self.rechazos.values())
+		print('Rostros evaluados: {}  guardados: {}  rechazados: {}'.format(
+			self.evaluados, aceptados, ', '.join('{} {}'.format(n, m) for m, n in self.rechazos.items())))
+		if self.evaluados:
+			print('Nitidez promedio: {:.1f} (mínima {})'.format(self.sumaNitidez / self.evaluados, self.nitidezMinima))
+		print('Rostros por celda de pose (filas: inclinación, columnas: giro):')
+		print(self.poses)
+
+class EscritorRostros():
+	# Escribe los .jpg en un hilo aparte: cv2.imwrite codifica y toca el disco, y hacerlo dentro
+	# del ciclo de la cámara hace que se pierdan frames. La cola no tiene límite porque la
+	# cantidad de rostros ya está acotada por maxRostros
+	def __init__(self):
+		self.cola = queue.Queue()
+		self.hilo = threading.Thread(target=self._escritor, daemon=True)
+		self.hilo.start()
+
+	def guardar(self, ruta, imagen):
+		# La imagen no debe modificarse después de entregarla
+		self.cola.put((ruta, imagen))
+
+	def cerrar(self):
+		# Espera a que se escriban todos los pendientes
+		self.cola.put(None)
+		self.hilo.join()
+
+	def _escritor(self):
+		while True:
+			mensaje = self.cola.get()
+			if mensaje is None:
+				break
+			cv2.imwrite(*mensaje)
@@ -1,6 +1,9 @@
 import cv2
 import os
+import time
 import imutils
+from detectorRostros import crearDetector
+from calidadRostros import FiltroCalidad, EscritorRostros
 
 emotionName = 'Enojo'
 emotionName = 'Felicidad'
@@ -9,37 +12,66 @@ emotionName = 'Tristeza'
 
 dataPath = 'D:\Semestre 2023\Inteligencia Artificial\Semana 15\7 RECONOCIMIENTO DE EMOCIONES\Data' #Cambia a la ruta donde hayas almacenado Data
 emotionsPath = dataPath + '/' + emotionName
+maxRostros = 200
+
+# Modo de calidad (ver calidadRostros.py): solo se guardan rostros nítidos, que no se parezcan
+# a uno ya guardado y sin llenar una sola pose. Verde = guardado, rojo = descartado
+modoCalidad = True
+filtro = FiltroCalidad(nitidezMinima=30, distanciaHash=6, maxPorPose=maxRostros//4) if modoCalidad else None
+segundosMaximos = 120 # La captura termina aunque no se junten maxRostros (p. ej. si casi todo sale duplicado)
 
 if not os.path.exists(emotionsPath):
 	print('Carpeta creada: ',emotionsPath)
 	os.makedirs(emotionsPath)
+escritor = EscritorRostros() # Los .jpg se escriben en otro hilo
 
 cap = cv2.VideoCapture(0,cv2.CAP_DSHOW)
 
-faceClassif = cv2.CascadeClassifier(cv2.data.haarcascades+'haarcascade_frontalface_default.xml')
+faceClassif = crearDetector('HAAR', scaleFactor=1.3, minNeighbors=5)
+#faceClassif = crearDetector('SSD', anchoEntrada=300)
+#faceClassif = crearDetector('YUNET', anchoEntrada=320)
 count = 0
+inicio = time.time()
+motivoFin = 'se cerró la cámara o el video'
 
 while True:
 
 	ret, frame = cap.read()
 	if ret == False: break
 	frame =  imutils.resize(frame, width=640)
-	gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 	auxFrame = frame.copy()
 
-	faces = faceClassif.detectMultiScale(gray,1.3,5)
+	faces = faceClassif.detectar(frame)
 
 	for (x,y,w,h) in faces:
-		cv2.rectangle(frame, (x,y),(x+w,y+h),(0,255,0),2)
 		rostro = auxFrame[y:y+h,x:x+w]
 		rostro = cv2.resize(rostro,(150,150),interpolation=cv2.INTER_CUBIC)
-		cv2.imwrite(emotionsPath + '/rotro_{}.jpg'.format(count),rostro)
+		if filtro is not None:
+			aceptado, motivo = filtro.evaluar(cv2.cvtColor(rostro, cv2.COLOR_BGR2GRAY))
+			if not aceptado:
+				cv2.rectangle(frame, (x,y),(x+w,y+h),(0,0,255),2)
+				cv2.putText(frame, motivo, (x,y-5), 1, 1.3, (0,0,255), 1, cv2.LINE_AA)
+				continue
+		cv2.rectangle(frame, (x,y),(x+w,y+h),(0,255,0),2)
+		escritor.guardar(emotionsPath + '/rotro_{}.jpg'.format(count),rostro)
 		count = count + 1
+		if count >= maxRostros: break
 	cv2.imshow('frame',frame)
 
 	k =  cv2.waitKey(1)
-	if k == 27 or count >= 200:
+	if k == 27:
+		motivoFin = 'Esc'
+		break
+	if count >= maxRostros:
+		motivoFin = 'se juntaron {} rostros'.format(maxRostros)
+		break
+	if time.time() - inicio > segundosMaximos:
+		motivoFin = 'pasaron {} s'.format(segundosMaximos)
 		break
 
 cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+cv2.destroyAllWindows()
+print('Captura terminada ({}): {} rostros'.format(motivoFin, count))
+escritor.cerrar()
+if filtro is not None:
+	filtro.resumen()
\ No newline at end of file
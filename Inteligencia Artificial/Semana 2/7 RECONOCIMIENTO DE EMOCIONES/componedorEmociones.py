@@ -0,0 +1,50 @@
+import cv2
+import os
+import numpy as np
+
+class ComponedorEmociones():
+	# Arma la imagen [frame | emoji] de reconocimientoEmociones.py sin leer archivos ni reservar
+	# memoria en cada frame: los emojis se leen y redimensionan una sola vez y el lienzo de
+	# salida se reserva con el primer frame. 'frame' es la parte izquierda del lienzo, así
+	# cap.read(componedor.frame) decodifica la cámara directo en él y no hay ni una copia.
+	def __init__(self, nombres, carpeta='Emojis', anchoPanel=300):
+		self.anchoPanel = anchoPanel
+		self.originales = {}
+		for nombre in nombres:
+			ruta = os.path.join(carpeta, nombre.lower() + '.jpeg')
+			imagen = cv2.imread(ruta) if os.path.exists(ruta) else None
+			if imagen is None:
+				print('No se encontró el emoji de', nombre, 'en', carpeta)
+				continue
+			self.originales[nombre] = imagen
+		self.lienzo = None
+		self.frame = None
+		self.panel = None
+		self.emojis = {}
+		self.mostrado = None
+
+	def _reservar(self, alto, ancho):
+		self.lienzo = np.zeros((alto, ancho + self.anchoPanel, 3), dtype=np.uint8)
+		self.frame = self.lienzo[:, :ancho]
+		self.panel = self.lienzo[:, ancho:]
+		self.emojis = {nombre: cv2.resize(imagen, (self.anchoPanel, alto), interpolation=cv2.INTER_AREA)
+			for nombre, imagen in self.originales.items()}
+		self.mostrado = None # El panel empieza en negro
+
+	def componer(self, frame, emocion=None):
+		# Regresa el lienzo con el frame y el emoji de 'emocion' (None o sin emoji = panel negro).
+		# El panel solo se reescribe cuando cambia la emoción que se muestra
+		alto, ancho = frame.shape[:2]
+		if self.lienzo is None or self.frame.shape[:2] != (alto, ancho):
+			self._reservar(alto, ancho)
+		if frame is not self.frame:
+			np.copyto(self.frame, frame)
+		if emocion not in self.emojis:
+			emocion = None
+		if emocion != self.mostrado:
+			if emocion is None:
+				self.panel[:] = 0
+			else:
+				np.copyto(self.panel, self.emojis[emocion])
+			self.mostrado = emocion
+		return self.lienzo
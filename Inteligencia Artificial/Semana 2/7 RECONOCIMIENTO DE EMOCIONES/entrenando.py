@@ -1,7 +1,30 @@
 import cv2
 import os
+import csv
 import numpy as np
 import time
+from multiprocessing import Pool, shared_memory
+from cargarDatos import cargarRostros
+from registroEtiquetas import RegistroEtiquetas
+
+try:
+	import resource # Solo existe en Linux/Mac, en Windows la memoria se reporta como n/d
+except ImportError:
+	resource = None
+
+dataPath = 'C:/Users/Gaby/Documents/GabyCV/VideosFilmora2020/13 Reconocimiento de emociones/Reconocimiento Emociones/Data' #Cambia a la ruta donde hayas almacenado Data
+
+# Los tres métodos se entrenan al mismo tiempo, cada uno en su propio proceso, y todos leen
+# los mismos rostros desde memoria compartida (sin una copia de facesData por proceso)
+metodos = ['EigenFaces', 'FisherFaces', 'LBPH']
+procesos = len(metodos) # Bájalo si no alcanza la memoria para entrenar todos a la vez
+tablaComparacion = 'comparacionModelos.csv'
+
+def memoriaPico():
+	# Pico de memoria residente del proceso en MB (ru_maxrss está en KB en Linux)
+	if resource is None:
+		return None
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
 
 def obtenerModelo(method,facesData,labels):
 	if method == 'EigenFaces': emotion_recognizer = cv2.face.EigenFaceRecognizer_create()
@@ -11,33 +34,74 @@ def obtenerModelo(method,facesData,labels):
 	# Entrenando el reconocedor de rostros
 	print("Entrenando ( "+method+" )...")
 	inicio = time.time()
-	emotion_recognizer.train(facesData, np.array(labels))
+	emotion_recognizer.train(list(facesData), np.array(labels))
 	tiempoEntrenamiento = time.time()-inicio
 	print("Tiempo de entrenamiento ( "+method+" ): ", tiempoEntrenamiento)
 
 	# Almacenando el modelo obtenido
 	emotion_recognizer.write("modelo"+method+".xml")
+	return tiempoEntrenamiento, os.path.getsize("modelo"+method+".xml")
 
-dataPath = 'C:/Users/Gaby/Documents/GabyCV/VideosFilmora2020/13 Reconocimiento de emociones/Reconocimiento Emociones/Data' #Cambia a la ruta donde hayas almacenado Data
-emotionsList = os.listdir(dataPath)
-print('Lista de personas: ', emotionsList)
-
-labels = []
-facesData = []
-label = 0
-
-for nameDir in emotionsList:
-	emotionsPath = dataPath + '/' + nameDir
-
-	for fileName in os.listdir(emotionsPath):
-		#print('Rostros: ', nameDir + '/' + fileName)
-		labels.append(label)
-		facesData.append(cv2.imread(emotionsPath+'/'+fileName,0))
-		#image = cv2.imread(emotionsPath+'/'+fileName,0)
-		#cv2.imshow('image',image)
-		#cv2.waitKey(10)
-	label = label + 1
-
-obtenerModelo('EigenFaces',facesData,labels)
-obtenerModelo('FisherFaces',facesData,labels)
-obtenerModelo('LBPH',facesData,labels)
+def entrenarCompartido(method, nombreMemoria, forma, labels):
+	# Corre dentro del Pool: facesData es una vista sobre la memoria compartida del proceso principal
+	memoria = shared_memory.SharedMemory(name=nombreMemoria)
+	try:
+		facesData = np.ndarray(forma, dtype=np.uint8, buffer=memoria.buf)
+		rssInicio = memoriaPico()
+		tiempoEntrenamiento, tamano = obtenerModelo(method, facesData, labels)
+		rssPico = memoriaPico()
+		del facesData
+	finally:
+		memoria.close()
+	return {
+		'metodo': method,
+		'entrenamiento_s': tiempoEntrenamiento,
+		'modelo_MB': tamano / 1024 / 1024,
+		'rss_pico_MB': rssPico,
+		# Lo que creció el proceso al entrenar (incluye las páginas de facesData que leyó)
+		'rss_entrenamiento_MB': None if rssPico is None else rssPico - rssInicio,
+	}
+
+def main():
+	# Leemos todas las imágenes en paralelo a un solo arreglo (N,150,150) uint8
+	facesData, labels, emotionsList = cargarRostros(dataPath)
+	print('Lista de personas: ', emotionsList)
+
+	# Las etiquetas salen del registro guardado junto a los modelos (como en entrenandoRF.py):
+	# cada emoción conserva su etiqueta aunque cambien las carpetas, las nuevas reciben la siguiente libre
+	registro = RegistroEtiquetas.paraModelo("modelo"+metodos[0]+".xml")
+	mapa = np.array([registro.etiqueta(nombre) for nombre in emotionsList], dtype=np.int32)
+	labels = mapa[np.asarray(labels)]
+
+	memoria = shared_memory.SharedMemory(create=True, size=facesData.nbytes)
+	try:
+		np.ndarray(facesData.shape, dtype=np.uint8, buffer=memoria.buf)[:] = facesData
+		forma = facesData.shape
+		del facesData
+		# maxtasksperchild=1: un proceso nuevo por método, así su pico de memoria no se mezcla
+		inicio = time.time()
+		with Pool(procesos, maxtasksperchild=1) as pool:
+			resultados = pool.starmap(entrenarCompartido, [(m, memoria.name, forma, labels) for m in metodos], chunksize=1)
+		print('Tiempo total: {:.2f} s'.format(time.time() - inicio))
+	finally:
+		memoria.close()
+		memoria.unlink()
+
+	# Guardamos el mismo registro junto a cada modelo (modelo<method>.json)
+	for r in resultados:
+		registro.ruta = "modelo"+r['metodo']+".json"
+		registro.guardar()
+
+	print('{:<14}{:>18}{:>12}{:>14}{:>22}'.format('Metodo', 'Entrenamiento s', 'Modelo MB', 'RSS pico MB', 'RSS entrenamiento MB'))
+	for r in resultados:
+		print('{:<14}{:>18.2f}{:>12.2f}{:>14}{:>22}'.format(r['metodo'], r['entrenamiento_s'], r['modelo_MB'],
+			'n/d' if r['rss_pico_MB'] is None else '{:.1f}'.format(r['rss_pico_MB']),
+			'n/d' if r['rss_entrenamiento_MB'] is None else '{:.1f}'.format(r['rss_entrenamiento_MB'])))
+	with open(tablaComparacion, 'w', newline='') as archivo:
+		escritor = csv.DictWriter(archivo, fieldnames=list(resultados[0]))
+		escritor.writeheader()
+		escritor.writerows(resultados)
+	print('Tabla guardada en', tablaComparacion)
+
+if __name__ == '__main__':
+	main()
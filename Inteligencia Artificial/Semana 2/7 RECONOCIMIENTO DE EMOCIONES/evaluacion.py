@@ -0,0 +1,145 @@
+import cv2
+import os
+import json
+import time
+import numpy as np
+from multiprocessing import Pool, shared_memory
+from cargarDatos import cargarRostros
+
+# Evalúa los reconocedores con validación cruzada estratificada de k particiones: cada
+# partición se entrena con el resto de los rostros y se prueba con los suyos. Reporta
+# exactitud, matriz de confusión, predicciones por segundo y, con la curva ROC de
+# "la predicción es correcta" contra la distancia, el umbral que mejor separa los aciertos
+# de los errores (el que se compara con result[1] en reconocimientoEmociones.py).
+dataPath = 'C:/Users/Gaby/Documents/GabyCV/VideosFilmora2020/13 Reconocimiento de emociones/Reconocimiento Emociones/Data' #Cambia a la ruta donde hayas almacenado Data
+k = 5
+procesos = os.cpu_count()
+semilla = 0
+salida = 'umbrales.json'
+
+METODOS = {
+	'EigenFaces': cv2.face.EigenFaceRecognizer_create,
+	'FisherFaces': cv2.face.FisherFaceRecognizer_create,
+	'LBPH': cv2.face.LBPHFaceRecognizer_create,
+}
+# Umbrales elegidos a mano en los scripts, para comparar
+umbralesActuales = {'EigenFaces': 5700, 'FisherFaces': 500, 'LBPH': 60}
+
+def particionesEstratificadas(labels, k, semilla=0):
+	# Regresa la partición (0..k-1) de cada rostro; cada clase se reparte por igual entre las k
+	rng = np.random.default_rng(semilla)
+	particion = np.empty(len(labels), dtype=np.int32)
+	for label in np.unique(labels):
+		indices = rng.permutation(np.flatnonzero(labels == label))
+		particion[indices] = (np.arange(len(indices)) + rng.integers(k)) % k
+	return particion
+
+def evaluarParticion(metodo, nombreMemoria, forma, labels, particion, p):
+	# Corre dentro del Pool: entrena con las demás particiones y predice la 'p'
+	cv2.setNumThreads(1) # El paralelismo lo dan las particiones, así las predicciones/s son comparables
+	memoria = shared_memory.SharedMemory(name=nombreMemoria)
+	try:
+		facesData = np.ndarray(forma, dtype=np.uint8, buffer=memoria.buf)
+		entrenamiento, prueba = np.flatnonzero(particion != p), np.flatnonzero(particion == p)
+		recognizer = METODOS[metodo]()
+		recognizer.train(list(facesData[entrenamiento]), labels[entrenamiento])
+		predichas = np.empty(len(prueba), dtype=np.int32)
+		distancias = np.empty(len(prueba), dtype=np.float64)
+		inicio = time.perf_counter()
+		for i, indice in enumerate(prueba):
+			predichas[i], distancias[i] = recognizer.predict(facesData[indice])
+		tiempo = time.perf_counter() - inicio
+		del facesData
+	finally:
+		memoria.close()
+	return metodo, p, labels[prueba], predichas, distancias, tiempo
+
+def curvaROC(correctos, distancias):
+	# Se acepta una predicción si su distancia es menor al umbral. Regresa (auc, umbral, tpr, fpr)
+	# con el umbral que maximiza tpr - fpr (índice de Youden). Sin aciertos o sin errores no hay
+	# curva ni umbral que elegir y regresa (None, None, None, None)
+	orden = np.argsort(distancias, kind='stable')
+	d, c = distancias[orden], correctos[orden]
+	positivos, negativos = c.sum(), (~c).sum()
+	if positivos == 0 or negativos == 0:
+		return None, None, None, None
+	tpr = np.concatenate([[0], np.cumsum(c) / positivos])
+	fpr = np.concatenate([[0], np.cumsum(~c) / negativos])
+	auc = float(np.sum((fpr[1:] - fpr[:-1]) * (tpr[1:] + tpr[:-1]) / 2))
+	# Solo se puede cortar donde cambia la distancia (los empates se aceptan o rechazan juntos)
+	cortes = np.concatenate([[True], d[1:] != d[:-1], [True]])
+	candidatos = np.flatnonzero(cortes)
+	mejor = candidatos[np.argmax(tpr[candidatos] - fpr[candidatos])]
+	if mejor == 0:
+		umbral = d[0]
+	elif mejor == len(d):
+		umbral = d[-1] + 1
+	else:
+		umbral = (d[mejor - 1] + d[mejor]) / 2
+	return auc, float(umbral), float(tpr[mejor]), float(fpr[mejor])
+
+def tasas(correctos, distancias, umbral):
+	aceptados = distancias < umbral
+	return (aceptados & correctos).sum() / max(correctos.sum(), 1), (aceptados & ~correctos).sum() / max((~correctos).sum(), 1)
+
+def imprimirConfusion(matriz, nombres):
+	nombres = [n[:10] for n in nombres]
+	print('{:>12}'.format('real\\pred') + ''.join('{:>11}'.format(n) for n in nombres))
+	for nombre, fila in zip(nombres, matriz):
+		print('{:>12}'.format(nombre) + ''.join('{:>11}'.format(v) for v in fila))
+
+def main():
+	facesData, labels, nombres = cargarRostros(dataPath)
+	particion = particionesEstratificadas(labels, k, semilla)
+	print('Rostros: {}  Clases: {}  Particiones: {}'.format(len(labels), len(nombres), k))
+
+	# Todas las particiones leen los rostros de la misma memoria compartida
+	memoria = shared_memory.SharedMemory(create=True, size=facesData.nbytes)
+	try:
+		np.ndarray(facesData.shape, dtype=np.uint8, buffer=memoria.buf)[:] = facesData
+		forma = facesData.shape
+		del facesData
+		tareas = [(m, memoria.name, forma, labels, particion, p) for m in METODOS for p in range(k)]
+		with Pool(procesos) as pool:
+			salidas = pool.starmap(evaluarParticion, tareas, chunksize=1)
+	finally:
+		memoria.close()
+		memoria.unlink()
+
+	# Se parte de los umbrales ya guardados, así un método sin umbral nuevo conserva el suyo
+	umbrales = {}
+	if os.path.exists(salida):
+		with open(salida) as archivo:
+			umbrales = json.load(archivo)
+	for metodo in METODOS:
+		propias = [s for s in salidas if s[0] == metodo]
+		reales = np.concatenate([s[2] for s in propias])
+		predichas = np.concatenate([s[3] for s in propias])
+		distancias = np.concatenate([s[4] for s in propias])
+		exactitudes = [np.mean(s[2] == s[3]) for s in propias]
+		velocidad = len(reales) / sum(s[5] for s in propias)
+		correctos = reales == predichas
+		auc, umbral, tpr, fpr = curvaROC(correctos, distancias)
+		if umbral is not None:
+			umbrales[metodo] = umbral
+
+		print('\n========== {} =========='.format(metodo))
+		print('Exactitud: {:.1%} (± {:.1%} entre particiones)'.format(np.mean(exactitudes), np.std(exactitudes)))
+		print('Predicciones/s: {:.0f} (un hilo)'.format(velocidad))
+		if umbral is not None:
+			print('ROC AUC: {:.3f}  Umbral sugerido: {:.1f} (acepta {:.1%} de los aciertos y {:.1%} de los errores)'.format(auc, umbral, tpr, fpr))
+		else:
+			print('ROC AUC: n/a ({}), no se sugiere umbral'.format('todas las predicciones son correctas' if correctos.all() else 'ninguna predicción es correcta'))
+		if metodo in umbralesActuales:
+			tprActual, fprActual = tasas(correctos, distancias, umbralesActuales[metodo])
+			print('Umbral actual:    {} (acepta {:.1%} de los aciertos y {:.1%} de los errores)'.format(umbralesActuales[metodo], tprActual, fprActual))
+		matriz = np.zeros((len(nombres), len(nombres)), dtype=np.int64)
+		np.add.at(matriz, (reales, predichas), 1)
+		imprimirConfusion(matriz, nombres)
+
+	with open(salida, 'w') as archivo:
+		json.dump(umbrales, archivo, indent=2)
+	print('\nUmbrales guardados en', salida)
+
+if __name__ == '__main__':
+	main()
@@ -1,14 +1,12 @@
 import cv2
 import os
-import numpy as np
-
-def emotionImage(emotion):
-	# Emojis
-	if emotion == 'Felicidad': image = cv2.imread('Emojis/felicidad.jpeg')
-	if emotion == 'Enojo': image = cv2.imread('Emojis/enojo.jpeg')
-	if emotion == 'Sorpresa': image = cv2.imread('Emojis/sorpresa.jpeg')
-	if emotion == 'Tristeza': image = cv2.imread('Emojis/tristeza.jpeg')
-	return image
+import json
+from registroEtiquetas import RegistroEtiquetas
+from seguimientoRostros import SeguidorRostros
+from detectorRostros import crearDetector
+from reconocimientoLotes import reconocerLote, dibujarResultados
+from componedorEmociones import ComponedorEmociones
+from votacionTemporal import VotoTemporal
 
 # ----------- Métodos usados para el entrenamiento y lectura del modelo ----------
 #method = 'EigenFaces'
@@ -22,72 +20,65 @@ if method == 'LBPH': emotion_recognizer = cv2.face.LBPHFaceRecognizer_create()
 emotion_recognizer.read('modelo'+method+'.xml')
 # --------------------------------------------------------------------------------
 
-dataPath = '.../Reconocimiento Emociones/Data' #Cambia a la ruta donde hayas almacenado Data
-imagePaths = os.listdir(dataPath)
-print('imagePaths=',imagePaths)
+# Nombres de cada etiqueta, guardados junto al modelo al entrenar (no se necesita la carpeta Data)
+registro = RegistroEtiquetas.paraModelo('modelo'+method+'.xml')
+print('Emociones=',list(registro.nombres.values()))
+
+# Distancia máxima para aceptar una predicción; evaluacion.py calcula unos con tus datos (umbrales.json)
+umbrales = {'EigenFaces': 5700, 'FisherFaces': 500, 'LBPH': 60}
+if os.path.exists('umbrales.json'):
+	with open('umbrales.json') as f:
+		umbrales.update(json.load(f))
 
 cap = cv2.VideoCapture(0,cv2.CAP_DSHOW)
 
-faceClassif = cv2.CascadeClassifier(cv2.data.haarcascades+'haarcascade_frontalface_default.xml')
+faceClassif = crearDetector('HAAR', scaleFactor=1.3, minNeighbors=5)
+#faceClassif = crearDetector('SSD', anchoEntrada=300)
+#faceClassif = crearDetector('YUNET', anchoEntrada=320)
+
+# Con seguimiento los rostros se detectan cada 5 frames y se siguen entre detecciones. Cada
+# rostro se vuelve a clasificar cada 'cadaPrediccion' frames y su emoción se decide por voto
+# de sus últimas predicciones (votacionTemporal.py), así la etiqueta no parpadea
+usarSeguimiento = True
+cadaPrediccion = 5
+seguidor = SeguidorRostros(faceClassif, emotion_recognizer, cadaN=5, cadaPrediccion=cadaPrediccion,
+	crearVoto=lambda: VotoTemporal(umbrales[method], ventana=5, histeresis=0.2))
+
+# Los emojis se leen una sola vez y cada frame de la cámara se decodifica directo en el
+# lienzo de salida [frame | emoji] (ver componedorEmociones.py)
+componedor = ComponedorEmociones(registro.nombres.values(), 'Emojis')
 
 while True:
 
-	ret,frame = cap.read()
+	ret,frame = cap.read(componedor.frame)
 	if ret == False: break
 	gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-	auxFrame = gray.copy()
-
-	nFrame = cv2.hconcat([frame, np.zeros((480,300,3),dtype=np.uint8)])
-
-	faces = faceClassif.detectMultiScale(gray,1.3,5)
-
-	for (x,y,w,h) in faces:
-		rostro = auxFrame[y:y+h,x:x+w]
-		rostro = cv2.resize(rostro,(150,150),interpolation= cv2.INTER_CUBIC)
-		result = emotion_recognizer.predict(rostro)
 
-		cv2.putText(frame,'{}'.format(result),(x,y-5),1,1.3,(255,255,0),1,cv2.LINE_AA)
+	if usarSeguimiento:
+		resultados = [(pista.caja, pista.resultado, pista.voto.etiqueta) for pista in seguidor.procesar(gray, frame) if pista.voto is not None]
+	else:
+		# Todos los rostros del frame se recortan a un lote y se reconocen juntos
+		faces = faceClassif.detectar(frame)
+		resultados = [(r.caja, (r.label, r.distancia), r.label if r.distancia < umbrales[method] else None)
+			for r in reconocerLote(gray, faces, emotion_recognizer)]
 
-		# EigenFaces
-		if method == 'EigenFaces':
-			if result[1] < 5700:
-				cv2.putText(frame,'{}'.format(imagePaths[result[0]]),(x,y-25),2,1.1,(0,255,0),1,cv2.LINE_AA)
-				cv2.rectangle(frame, (x,y),(x+w,y+h),(0,255,0),2)
-				image = emotionImage(imagePaths[result[0]])
-				nFrame = cv2.hconcat([frame,image])
-			else:
-				cv2.putText(frame,'No identificado',(x,y-20),2,0.8,(0,0,255),1,cv2.LINE_AA)
-				cv2.rectangle(frame, (x,y),(x+w,y+h),(0,0,255),2)
-				nFrame = cv2.hconcat([frame,np.zeros((480,300,3),dtype=np.uint8)])
-		
-		# FisherFace
-		if method == 'FisherFaces':
-			if result[1] < 500:
-				cv2.putText(frame,'{}'.format(imagePaths[result[0]]),(x,y-25),2,1.1,(0,255,0),1,cv2.LINE_AA)
-				cv2.rectangle(frame, (x,y),(x+w,y+h),(0,255,0),2)
-				image = emotionImage(imagePaths[result[0]])
-				nFrame = cv2.hconcat([frame,image])
-			else:
-				cv2.putText(frame,'No identificado',(x,y-20),2,0.8,(0,0,255),1,cv2.LINE_AA)
-				cv2.rectangle(frame, (x,y),(x+w,y+h),(0,0,255),2)
-				nFrame = cv2.hconcat([frame,np.zeros((480,300,3),dtype=np.uint8)])
-		
-		# LBPHFace
-		if method == 'LBPH':
-			if result[1] < 60:
-				cv2.putText(frame,'{}'.format(imagePaths[result[0]]),(x,y-25),2,1.1,(0,255,0),1,cv2.LINE_AA)
-				cv2.rectangle(frame, (x,y),(x+w,y+h),(0,255,0),2)
-				image = emotionImage(imagePaths[result[0]])
-				nFrame = cv2.hconcat([frame,image])
-			else:
-				cv2.putText(frame,'No identificado',(x,y-20),2,0.8,(0,0,255),1,cv2.LINE_AA)
-				cv2.rectangle(frame, (x,y),(x+w,y+h),(0,0,255),2)
-				nFrame = cv2.hconcat([frame,np.zeros((480,300,3),dtype=np.uint8)])
+	# label es None si la distancia no pasó el umbral del método (o si así lo decidió el voto)
+	emocion = dibujarResultados(frame, resultados, registro, 'No identificado')
 
+	nFrame = componedor.componer(frame, emocion)
 	cv2.imshow('nFrame',nFrame)
 	k = cv2.waitKey(1)
 	if k == 27:
 		break
 
+if usarSeguimiento:
+	e = seguidor.estadisticas()
+	print('Predicciones/s: {:.1f} (sin seguimiento: {:.1f}, ahorro {:.0%})'.format(
+		e['prediccionesPorSegundo'], e['sinSeguimientoPorSegundo'], e['ahorro']))
+	# Estabilidad contra latencia: cuántas veces cambió la predicción cruda y cuántas la
+	# etiqueta mostrada, y cuánto tardó en mostrarse una emoción nueva
+	print('Cambios de emoción: {} sin voto, {} con voto; latencia media {:.1f} frames ({:.0f} ms a {:.1f} FPS)'.format(
+		e['cambiosCrudos'], e['cambiosEstables'], e['latenciaFrames'],
+		1000 * e['latenciaFrames'] / e['fps'] if e['fps'] else 0, e['fps']))
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
@@ -1,10 +1,20 @@
 import cv2
 import numpy as np
+from movimientoReducido import DetectorMovimiento
+from grabadorAlertas import GrabadorAlertas
 
 cap = cv2.VideoCapture('aeropuerto.mp4')
 
-fgbg = cv2.bgsegm.createBackgroundSubtractorMOG()
-kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE,(3,3))
+# Cada alerta se guarda como clip en la carpeta 'alertas' (3 s antes y 3 s después
+# del movimiento) y se registra en alertas.jsonl
+fps = cap.get(cv2.CAP_PROP_FPS) or 15
+grabador = GrabadorAlertas(fps, segundosPrevios=3, segundosPosteriores=3)
+
+# Factor de reducción para el sustractor y la morfología (1.0 = resolución completa).
+# Para cámaras 1080p un valor de 0.5 o 0.33 reduce la latencia de la alarma,
+# las cajas se siguen dibujando en coordenadas del frame original
+escala = 1.0
+detector = None
 
 while True:
 
@@ -21,28 +31,19 @@ while True:
 
 	# Especificamos los puntos extremos del área a analizar
 	area_pts = np.array([[240,320], [480,320], [620,frame.shape[0]], [50,frame.shape[0]]])
-	
-	# Con ayuda de una imagen auxiliar, determinamos el área
-	# sobre la cual actuará el detector de movimiento
-	imAux = np.zeros(shape=(frame.shape[:2]), dtype=np.uint8)
-	imAux = cv2.drawContours(imAux, [area_pts], -1, (255), -1)
-	image_area = cv2.bitwise_and(gray, gray, mask=imAux)
-
-	# Obtendremos la imagen binaria donde la región en blanco representa
-	# la existencia de movimiento
-	fgmask = fgbg.apply(image_area)
-	fgmask = cv2.morphologyEx(fgmask, cv2.MORPH_OPEN, kernel)
-	fgmask = cv2.dilate(fgmask, None, iterations=2)
-
-	# Encontramos los cotnornos presentes en fgmask, para luego basándonos
-	# en su área poder determina si existe movimiento
-	cnts = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0]
-	for cnt in cnts:
-		if cv2.contourArea(cnt) > 500:
-			x, y, w, h = cv2.boundingRect(cnt)
-			cv2.rectangle(frame, (x,y), (x+w, y+h),(0,255,0), 2)
-			texto_estado = "Estado: ALERTA Movimiento Detectado!"
-			color = (0, 0, 255)	
+
+	# El detector construye la máscara del área (en la escala reducida) una sola vez
+	if detector is None:
+		detector = DetectorMovimiento(area_pts, escala=escala, areaMin=500, iteraciones=2)
+
+	# Obtenemos las cajas de los contornos con área suficiente,
+	# ya reproyectadas a la resolución completa del frame
+	cajas = detector.detectar(gray)
+	fgmask = detector.fgmask
+	for x, y, w, h in cajas:
+		cv2.rectangle(frame, (x,y), (x+w, y+h),(0,255,0), 2)
+		texto_estado = "Estado: ALERTA Movimiento Detectado!"
+		color = (0, 0, 255)
 
 	# Visuzalizamos el alrededor del área que vamos a analizar
 	# y el estado de la detección de movimiento		
@@ -50,6 +51,8 @@ while True:
 	cv2.putText(frame, texto_estado , (10, 30),
 				cv2.FONT_HERSHEY_SIMPLEX, 1, color,2)
 
+	grabador.agregar(frame, len(cajas) > 0)
+
 	cv2.imshow('fgmask', fgmask)
 	cv2.imshow("frame", frame)
 
@@ -57,5 +60,6 @@ while True:
 	if k == 27:
 		break
 
+grabador.cerrar()
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
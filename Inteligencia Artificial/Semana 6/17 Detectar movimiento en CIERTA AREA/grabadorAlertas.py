@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import queue
+import threading
+import cv2
+import numpy as np
+
+class GrabadorAlertas():
+	# Guarda un clip por cada alerta de movimiento: los 'segundosPrevios' antes de que
+	# empiece el movimiento, el evento completo y 'segundosPosteriores' después de que termina.
+	# Los frames previos viven en un buffer circular y la escritura del video la hace un hilo
+	# aparte, así el ciclo de detección nunca espera al codificador. Al empezar una alerta el
+	# buffer se le presta al escritor y se sigue con otro que él ya devolvió (solo se reserva
+	# uno nuevo si todavía no devuelve ninguno). Todos los mensajes se mandan sin esperar: si
+	# la cola está llena se pierden y se cuentan en 'descartados'.
+	# Cada alerta también se registra como una línea JSON en 'registro'.
+	def __init__(self, fps, segundosPrevios=3, segundosPosteriores=3, carpeta='alertas',
+				registro='alertas.jsonl', fourcc='XVID', extension='.avi', maxCola=256):
+		self.fps = fps
+		self.nPrevios = max(1, int(round(fps * segundosPrevios)))
+		self.nPosteriores = max(1, int(round(fps * segundosPosteriores)))
+		self.carpeta = carpeta
+		self.registro = registro
+		self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+		self.extension = extension
+		if not os.path.exists(carpeta):
+			os.makedirs(carpeta)
+
+		self.buffer = None
+		self.indice = 0        # Siguiente posición a escribir en el buffer
+		self.llenos = 0        # Frames válidos en el buffer
+		self.activo = False
+		self.sinMovimiento = 0
+		self.evento = None
+		self.descartados = 0
+		# Buffers que el escritor ya terminó de copiar y se pueden volver a usar
+		self.libres = queue.Queue()
+
+		self.cola = queue.Queue(maxsize=maxCola)
+		self.hilo = threading.Thread(target=self._escritor, daemon=True)
+		self.hilo.start()
+
+	def agregar(self, frame, movimiento):
+		# Llamar una vez por frame. El frame no debe modificarse después de entregarlo
+		if self.buffer is None:
+			self.buffer = np.empty((self.nPrevios,) + frame.shape, dtype=frame.dtype)
+
+		if movimiento and not self.activo:
+			self._iniciar(frame)
+		elif self.activo:
+			self._enviar(('frame', frame))
+			self.sinMovimiento = 0 if movimiento else self.sinMovimiento + 1
+			self.evento['frames'] += 1
+			if self.sinMovimiento >= self.nPosteriores:
+				self._terminar()
+		else:
+			# Sin alerta: solo copiamos el frame dentro del buffer circular
+			self.buffer[self.indice] = frame
+			self.indice = (self.indice + 1) % self.nPrevios
+			self.llenos = min(self.llenos + 1, self.nPrevios)
+
+	def cerrar(self):
+		if self.activo:
+			self._terminar()
+		self.cola.put(None)
+		self.hilo.join()
+
+	def _iniciar(self, frame):
+		inicio = time.time()
+		nombre = time.strftime('alerta_%Y%m%d_%H%M%S', time.localtime(inicio))
+		ruta = os.path.join(self.carpeta, nombre + '_{:03d}'.format(int(inicio * 1000) % 1000) + self.extension)
+		# Orden cronológico de los frames previos dentro del buffer circular
+		orden = [(self.indice - self.llenos + i) % self.nPrevios for i in range(self.llenos)]
+		self.activo = True
+		self.sinMovimiento = 0
+		self.evento = {'evento': 'alerta', 'archivo': ruta, 'inicio': inicio, 'framesPrevios': len(orden), 'frames': 1}
+		if self._enviar(('inicio', ruta, frame.shape, self.buffer, orden)):
+			# El escritor se queda con este buffer hasta copiarlo; seguimos llenando otro
+			try:
+				self.buffer = self.libres.get_nowait()
+			except queue.Empty:
+				self.buffer = np.empty_like(self.buffer)
+		self.indice = 0
+		self.llenos = 0
+		self._enviar(('frame', frame))
+		self._enviar(('registro', dict(self.evento, estado='inicio')))
+
+	def _terminar(self):
+		self.activo = False
+		self.evento['fin'] = time.time()
+		self.evento['duracion'] = self.evento['fin'] - self.evento['inicio']
+		self.evento['descartados'] = self.descartados
+		self._enviar(('fin',))
+		self._enviar(('registro', dict(self.evento, estado='fin')))
+		self.evento = None
+		self.descartados = 0
+
+	def _enviar(self, mensaje):
+		# Si el disco no alcanza al video preferimos perder mensajes que detener la detección.
+		# Regresa True si el mensaje entró a la cola
+		try:
+			self.cola.put_nowait(mensaje)
+			return True
+		except queue.Full:
+			self.descartados += 1
+			return False
+
+	def _escritor(self):
+		video = None
+		while True:
+			mensaje = self.cola.get()
+			if mensaje is None:
+				break
+			tipo = mensaje[0]
+			if tipo == 'inicio':
+				_, ruta, forma, buffer, orden = mensaje
+				if video is not None: # Se perdió el 'fin' de la alerta anterior
+					video.release()
+				video = cv2.VideoWriter(ruta, self.fourcc, self.fps, (forma[1], forma[0]), len(forma) == 3)
+				for i in orden:
+					video.write(buffer[i])
+				self.libres.put(buffer)
+			elif tipo == 'frame' and video is not None:
+				video.write(mensaje[1])
+			elif tipo == 'fin' and video is not None:
+				video.release()
+				video = None
+			elif tipo == 'registro':
+				with open(self.registro, 'a', encoding='utf8') as f:
+					f.write(json.dumps(mensaje[1]) + '\n')
+		if video is not None:
+			video.release()
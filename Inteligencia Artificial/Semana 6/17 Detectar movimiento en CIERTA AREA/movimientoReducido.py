@@ -0,0 +1,47 @@
+import cv2
+import numpy as np
+
+class DetectorMovimiento():
+	# Aplica el sustractor MOG, la morfología y findContours sobre una copia
+	# reducida del frame (escala < 1) y regresa las cajas en coordenadas del
+	# frame original. Con escala = 1.0 se comporta igual que detectar_movimiento_area.py
+	def __init__(self, area_pts, escala=1.0, areaMin=500, iteraciones=2):
+		self.area_pts = np.array(area_pts)
+		self.escala = escala
+		# Las áreas escalan con el cuadrado del factor de reducción
+		self.areaMin = areaMin * escala * escala
+		# La dilatación crece ~1 pixel por iteración, la ajustamos a la nueva escala
+		self.iteraciones = max(1, int(round(iteraciones * escala)))
+		self.fgbg = cv2.bgsegm.createBackgroundSubtractorMOG()
+		self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE,(3,3))
+		self.imAux = None
+		self.fgmask = None
+
+	def _prepararMascara(self, alto, ancho):
+		# La máscara del área se dibuja una sola vez, ya en la resolución reducida
+		self.tamano = (max(1, int(round(ancho * self.escala))), max(1, int(round(alto * self.escala))))
+		pts = np.round(self.area_pts * self.escala).astype(np.int32)
+		self.imAux = np.zeros((self.tamano[1], self.tamano[0]), dtype=np.uint8)
+		self.imAux = cv2.drawContours(self.imAux, [pts], -1, (255), -1)
+
+	def detectar(self, gray):
+		# Regresa una lista de cajas (x, y, w, h) en coordenadas del frame original
+		if self.imAux is None:
+			self._prepararMascara(gray.shape[0], gray.shape[1])
+
+		if self.escala != 1.0:
+			gray = cv2.resize(gray, self.tamano, interpolation=cv2.INTER_AREA)
+		image_area = cv2.bitwise_and(gray, gray, mask=self.imAux)
+
+		fgmask = self.fgbg.apply(image_area)
+		fgmask = cv2.morphologyEx(fgmask, cv2.MORPH_OPEN, self.kernel)
+		self.fgmask = cv2.dilate(fgmask, None, iterations=self.iteraciones)
+
+		cnts = cv2.findContours(self.fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0]
+		cajas = [cv2.boundingRect(cnt) for cnt in cnts if cv2.contourArea(cnt) > self.areaMin]
+		if len(cajas) == 0 or self.escala == 1.0:
+			return cajas
+
+		# Reproyectamos todas las cajas a la resolución completa en un solo paso
+		cajas = np.array(cajas, dtype=np.float32) / self.escala
+		return [tuple(c) for c in np.round(cajas).astype(int).tolist()]
@@ -1,5 +1,6 @@
 import cv2
 import imutils
+from detectorRostros import crearDetector
 
 # Videostreaming o video de entrada
 cap = cv2.VideoCapture(0,cv2.CAP_DSHOW)
@@ -10,7 +11,9 @@ cap = cv2.VideoCapture(0,cv2.CAP_DSHOW)
 image = cv2.imread('2021.png', cv2.IMREAD_UNCHANGED)
 
 # Detector de rostros
-faceClassif = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+faceClassif = crearDetector('HAAR', scaleFactor=1.3, minNeighbors=5)
+#faceClassif = crearDetector('SSD', anchoEntrada=300)
+#faceClassif = crearDetector('YUNET', anchoEntrada=320)
 
 while True:
 
@@ -19,7 +22,7 @@ while True:
 	frame = imutils.resize(frame, width=640)
 
 	# Detección de los rostros presentes en el fotograma
-	faces = faceClassif.detectMultiScale(frame, 1.3, 5)
+	faces = faceClassif.detectar(frame)
 
 	for (x, y, w, h) in faces:
 		#cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0),2)
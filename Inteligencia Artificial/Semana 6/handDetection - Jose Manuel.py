@@ -9,6 +9,8 @@ mp_drawing_styles = mp.solutions.drawing_styles
 mp_hands = mp.solutions.hands
 
 cap = cv2.VideoCapture(1)
+#Ancho de la copia que procesa MediaPipe; los puntos salen normalizados y se dibujan en el frame grande
+anchoInferencia = 320
 with mp_hands.Hands(
     static_image_mode = False,
     max_num_hands = 2,
@@ -23,8 +25,9 @@ with mp_hands.Hands(
         height, width, _ = frame.shape
         #Usaremos flip para no ver en espejo la imagen
         frame = cv2.flip(frame,1)
-        #Cambiamos la imagen de frame a RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        #Reducimos una copia y la cambiamos a RGB
+        pequena = cv2.resize(frame, (anchoInferencia, round(height * anchoInferencia / width)), interpolation=cv2.INTER_AREA)
+        frame_rgb = cv2.cvtColor(pequena, cv2.COLOR_BGR2RGB)
         #TOmar datos y los mandamos a result
         result = hands.process(frame_rgb)
         #Cuestiono si tengo algo que procesar o detecto alguna mano
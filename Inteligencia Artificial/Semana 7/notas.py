@@ -16,6 +16,10 @@ mp_hands = mp.solutions.hands
 
 cap = cv2.VideoCapture(1, cv2.CAP_DSHOW)
 
+# Ancho de la copia que procesa MediaPipe. El frame se muestra a 1000 px pero los puntos
+# salen normalizados (0 a 1), así que se multiplican por el ancho y alto del frame grande igual
+anchoInferencia = 320
+
 # Pulgar
 thumb_points = [1, 2, 4]
 
@@ -45,7 +49,8 @@ with mp_hands.Hands(
           frame = imutils.resize(frame, width=1000, height=800)
           frame = cv2.flip(frame, 1)
           height, width, _ = frame.shape
-          frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+          pequena = cv2.resize(frame, (anchoInferencia, round(height * anchoInferencia / width)), interpolation=cv2.INTER_AREA)
+          frame_rgb = cv2.cvtColor(pequena, cv2.COLOR_BGR2RGB)
           results = hands.process(frame_rgb)
           print(results)
           fingers_counter = "_"
@@ -1,10 +1,13 @@
 import cv2
+from ajusteCascada import cargarParametros
 cap = cv2.VideoCapture(0)
 majinBooClassif = cv2.CascadeClassifier('cascade.xml')
+# Parámetros de detectMultiScale encontrados con ajusteCascada.py (o los de siempre si no se ha ejecutado)
+parametros = cargarParametros('parametrosCascada.json', scaleFactor = 5, minNeighbors = 91, minSize = (70,78))
 while True:
     ret,frame = cap.read()
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    toy = majinBooClassif.detectMultiScale(gray,scaleFactor = 5,minNeighbors = 91,minSize=(70,78))
+    toy = majinBooClassif.detectMultiScale(gray, **parametros)
     for (x,y,w,h) in toy:
         cv2.rectangle(frame,(x,y),(x+w,y+h),(0,0,255),2)
         cv2.putText(frame,'Rostro Detectado',(x,y-10),2,0.7,(0,255,0),2,cv2.LINE_AA)